@@ -1,94 +1,138 @@
 # infrastructure/feast/create_sample_data.py
-import pandas as pd
+import argparse
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import numpy as np
 from datetime import datetime, timedelta
 import os
 
-def create_sample_data():
-    """Create realistic sample data for the ERP feature store"""
-    
-    # Create directories if they don't exist
-    os.makedirs('data/raw/product_demand', exist_ok=True)
-    os.makedirs('data/raw/customer_behavior', exist_ok=True)
-    os.makedirs('data/raw/supplier_performance', exist_ok=True)
-    
+CATEGORIES = pa.array(['ELECTRONICS', 'CLOTHING', 'HOME_GOODS', 'BOOKS', 'SPORTS'])
+CHUNK_ROWS = 1_000_000  # Rows generated, and written as one Parquet row group, at a time
+
+def entity_ids(prefix, width, indices):
+    """'PROD_00001'-style ids for 0-based entity indices, built in Arrow rather than per row"""
+    numbers = pc.utf8_lpad(pc.cast(pa.array(indices + 1), pa.string()), width=width, padding='0')
+    return pc.binary_join_element_wise(prefix, numbers, '')
+
+def timestamps(base_date, day_offsets):
+    days = np.asarray(day_offsets, dtype='timedelta64[D]')
+    return pa.array(np.datetime64(base_date, 'ns') + days)
+
+def write_chunks(path, total_rows, make_chunk, chunk_rows, seed):
+    """Stream make_chunk(rng, start, stop) tables to one Parquet file, a row group per chunk"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    writer = None
+    try:
+        for chunk_index, start in enumerate(range(0, total_rows, chunk_rows)):
+            # Seeded per chunk: same seed and chunk size give the same file
+            rng = np.random.default_rng([seed, chunk_index])
+            table = make_chunk(rng, start, min(start + chunk_rows, total_rows))
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table, row_group_size=chunk_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total_rows
+
+def create_sample_data(n_products=100, days=60, n_customers=500, n_suppliers=50,
+                       output_dir='data/raw', chunk_rows=CHUNK_ROWS, seed=None):
+    """Create realistic sample data for the ERP feature store.
+
+    Product demand has one row per product per day; customers and suppliers
+    one row each. Every table is generated chunk by chunk with array-wise
+    random draws, so memory stays around one chunk whatever the size.
+    """
+    seed = seed if seed is not None else np.random.SeedSequence().entropy
+
     print("📊 Creating sample ERP data...")
-    
+
+    base_date = datetime.now() - timedelta(days=days)
+
     # 1. Product Demand Data
-    product_ids = [f"PROD_{i:05d}" for i in range(1, 101)]
-    base_date = datetime.now() - timedelta(days=60)
-    
-    product_data = []
-    for i, product_id in enumerate(product_ids):
-        for day in range(60):
-            event_date = base_date + timedelta(days=day)
-            product_data.append({
-                'product_id': product_id,
-                'event_timestamp': event_date,
-                'created_timestamp': event_date,
-                'avg_demand_7d': np.random.uniform(5, 50),
-                'avg_demand_30d': np.random.uniform(20, 200),
-                'demand_volatility': np.random.uniform(0.1, 0.8),
-                'seasonality_factor': np.random.uniform(0.7, 1.3)
-            })
-    
-    product_df = pd.DataFrame(product_data)
-    # Ensure timestamps are properly formatted
-    product_df['event_timestamp'] = pd.to_datetime(product_df['event_timestamp'])
-    product_df['created_timestamp'] = pd.to_datetime(product_df['created_timestamp'])
-    product_df.to_parquet('data/raw/product_demand/product_demand_data.parquet')
-    print(f"✅ Created product demand data: {len(product_df)} records")
-    
+    def product_chunk(rng, start, stop):
+        # Product-major: every day of the first product, then the next product, ...
+        rows = np.arange(start, stop)
+        n = len(rows)
+        event_timestamp = timestamps(base_date, rows % days)
+        return pa.table({
+            'product_id': entity_ids('PROD_', 5, rows // days),
+            'event_timestamp': event_timestamp,
+            'created_timestamp': event_timestamp,
+            'avg_demand_7d': rng.uniform(5, 50, n),
+            'avg_demand_30d': rng.uniform(20, 200, n),
+            'demand_volatility': rng.uniform(0.1, 0.8, n),
+            'seasonality_factor': rng.uniform(0.7, 1.3, n),
+            'price': rng.uniform(10, 100, n)
+        })
+
+    rows = write_chunks(os.path.join(output_dir, 'product_demand', 'product_demand_data.parquet'),
+                        n_products * days, product_chunk, chunk_rows, seed)
+    print(f"✅ Created product demand data: {rows} records")
+
     # 2. Customer Behavior Data
-    customer_ids = [f"CUST_{i:06d}" for i in range(1, 501)]
-    
-    customer_data = []
-    for i, customer_id in enumerate(customer_ids):
-        event_date = base_date + timedelta(days=np.random.randint(0, 90))
-        customer_data.append({
-            'customer_id': customer_id,
-            'event_timestamp': event_date,
-            'created_timestamp': event_date,
-            'total_spend_30d': np.random.uniform(100, 10000),
-            'order_frequency': np.random.uniform(1, 20),
-            'avg_order_value': np.random.uniform(25, 500),
-            'preferred_category': np.random.choice(['ELECTRONICS', 'CLOTHING', 'HOME_GOODS', 'BOOKS', 'SPORTS'])
+    def customer_chunk(rng, start, stop):
+        n = stop - start
+        # Spread over the window plus half again, as before (60 days -> 0..89)
+        event_timestamp = timestamps(base_date, rng.integers(0, days + days // 2, n))
+        return pa.table({
+            'customer_id': entity_ids('CUST_', 6, np.arange(start, stop)),
+            'event_timestamp': event_timestamp,
+            'created_timestamp': event_timestamp,
+            'total_spend_30d': rng.uniform(100, 10000, n),
+            'order_frequency': rng.uniform(1, 20, n),
+            'avg_order_value': rng.uniform(25, 500, n),
+            'preferred_category': pc.take(CATEGORIES, rng.integers(0, len(CATEGORIES), n))
         })
-    
-    customer_df = pd.DataFrame(customer_data)
-    customer_df['event_timestamp'] = pd.to_datetime(customer_df['event_timestamp'])
-    customer_df['created_timestamp'] = pd.to_datetime(customer_df['created_timestamp'])
-    customer_df.to_parquet('data/raw/customer_behavior/customer_behavior_data.parquet')
-    print(f"✅ Created customer behavior data: {len(customer_df)} records")
-    
+
+    rows = write_chunks(os.path.join(output_dir, 'customer_behavior', 'customer_behavior_data.parquet'),
+                        n_customers, customer_chunk, chunk_rows, seed + 1)
+    print(f"✅ Created customer behavior data: {rows} records")
+
     # 3. Supplier Performance Data
-    supplier_ids = [f"SUPP_{i:04d}" for i in range(1, 51)]
-    
-    supplier_data = []
-    for i, supplier_id in enumerate(supplier_ids):
-        event_date = base_date + timedelta(days=np.random.randint(0, 60))
-        supplier_data.append({
-            'supplier_id': supplier_id,
-            'event_timestamp': event_date,
-            'created_timestamp': event_date,
-            'on_time_delivery_rate': np.random.uniform(0.85, 0.99),
-            'quality_rating': np.random.uniform(3.5, 5.0),
-            'avg_lead_time': np.random.uniform(7, 30),
-            'price_competitiveness': np.random.uniform(0.9, 1.1)
+    def supplier_chunk(rng, start, stop):
+        n = stop - start
+        event_timestamp = timestamps(base_date, rng.integers(0, days, n))
+        return pa.table({
+            'supplier_id': entity_ids('SUPP_', 4, np.arange(start, stop)),
+            'event_timestamp': event_timestamp,
+            'created_timestamp': event_timestamp,
+            'on_time_delivery_rate': rng.uniform(0.85, 0.99, n),
+            'quality_rating': rng.uniform(3.5, 5.0, n),
+            'avg_lead_time': rng.uniform(7, 30, n),
+            'price_competitiveness': rng.uniform(0.9, 1.1, n)
         })
-    
-    supplier_df = pd.DataFrame(supplier_data)
-    supplier_df['event_timestamp'] = pd.to_datetime(supplier_df['event_timestamp'])
-    supplier_df['created_timestamp'] = pd.to_datetime(supplier_df['created_timestamp'])
-    supplier_df.to_parquet('data/raw/supplier_performance/supplier_performance_data.parquet')
-    print(f"✅ Created supplier performance data: {len(supplier_df)} records")
-    
+
+    rows = write_chunks(os.path.join(output_dir, 'supplier_performance', 'supplier_performance_data.parquet'),
+                        n_suppliers, supplier_chunk, chunk_rows, seed + 2)
+    print(f"✅ Created supplier performance data: {rows} records")
+
     print("\n🎉 Sample data creation complete!")
     print("📁 Data locations:")
-    print("   - Product demand: infrastructure/feast/data/raw/product_demand/")
-    print("   - Customer behavior: infrastructure/feast/data/raw/customer_behavior/")
-    print("   - Supplier performance: infrastructure/feast/data/raw/supplier_performance/")
+    print(f"   - Product demand: {output_dir}/product_demand/")
+    print(f"   - Customer behavior: {output_dir}/customer_behavior/")
+    print(f"   - Supplier performance: {output_dir}/supplier_performance/")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create sample ERP data for the feature store")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--days", type=int, default=60, help="Days of product demand history")
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--suppliers", type=int, default=50)
+    parser.add_argument("--output-dir", default="data/raw")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, help="Fix for reproducible output")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    create_sample_data()
-    
\ No newline at end of file
+    args = parse_args()
+    create_sample_data(
+        n_products=args.products,
+        days=args.days,
+        n_customers=args.customers,
+        n_suppliers=args.suppliers,
+        output_dir=args.output_dir,
+        chunk_rows=args.chunk_rows,
+        seed=args.seed
+    )
@@ -20,6 +20,7 @@ product_demand_features = FeatureView(
         Field(name="avg_demand_30d", dtype=Float32),
         Field(name="demand_volatility", dtype=Float32),
         Field(name="seasonality_factor", dtype=Float32),
+        Field(name="price", dtype=Float32),  # Served to the demand model alongside avg_demand_7d/30d
     ],
     source=product_demand_source,
     online=True,
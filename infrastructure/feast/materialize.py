@@ -0,0 +1,241 @@
+# infrastructure/feast/materialize.py
+"""Incremental, parallel materialization of the Aurora feature views into the online store.
+
+Each view's pending range (its watermark up to --end) is split across
+--shards tasks by a hash of the entity key, and the tasks of all views run
+on a process pool, each worker with its own FeatureStore. A task reads the
+range --window-hours at a time, oldest first, from the view's Parquet
+source with the timestamp filter pushed down, keeps its shard's rows, and
+reduces them to the latest row per entity. It then writes that, and only
+that, --batch-rows rows per write_to_online_store call (one Redis pipeline
+each). A backfill therefore writes every entity once, however long the
+range, and shards never write the same entity.
+
+The Redis online store also skips a row older than the one it holds, so a
+rerun over a range that was partly written cannot move an entity back in
+time.
+
+A view's watermark advances to --end once all of its shards have
+succeeded; after a failure, a rerun redoes the view's range.
+
+With --notify-bootstrap-servers, every view that wrote rows is announced
+on the ml-features topic as {"feature_view": "<view>"} so that serving
+processes drop their cached values of that view.
+
+    python materialize.py --workers 8 --shards 8 --window-hours 24
+    python materialize.py --views product_demand_features --start 2024-01-01T00:00:00
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from feast import FeatureStore, FileSource
+
+REPO_PATH = os.path.dirname(os.path.abspath(__file__))
+FEATURE_VIEWS = ["product_demand_features", "customer_behavior_features", "supplier_performance_features"]
+WATERMARKS_PATH = os.path.join(REPO_PATH, "data", "feature_store", "materialization_watermarks.json")
+
+_store = None  # One FeatureStore per worker process
+
+
+class WatermarkStore:
+    """Per-view materialized-through timestamps, kept in a small JSON file"""
+
+    def __init__(self, path=WATERMARKS_PATH):
+        self.path = path
+        self.watermarks = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.watermarks = {view: datetime.fromisoformat(ts) for view, ts in json.load(f).items()}
+
+    def get(self, view):
+        return self.watermarks.get(view)
+
+    def advance(self, view, timestamp):
+        self.watermarks[view] = timestamp
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({name: ts.isoformat() for name, ts in self.watermarks.items()}, f, indent=2)
+        os.replace(temporary, self.path)  # Never leave a half-written file behind
+
+
+class PushNotifier:
+    """Announces online store writes on ml-features; confluent-kafka is only needed when enabled"""
+
+    def __init__(self, bootstrap_servers, topic="ml-features"):
+        from confluent_kafka import Producer
+        self.topic = topic
+        self.producer = Producer({"bootstrap.servers": bootstrap_servers})
+
+    def notify(self, view_name):
+        self.producer.produce(self.topic, key=view_name.encode(), value=json.dumps({"feature_view": view_name}))
+        self.producer.poll(0)
+
+    def close(self):
+        self.producer.flush(10)
+
+
+def make_windows(start, end, window):
+    windows = []
+    while start < end:
+        windows.append((start, min(start + window, end)))
+        start += window
+    return windows
+
+
+def _open_store(repo_path):
+    global _store
+    _store = FeatureStore(repo_path=repo_path)
+
+
+def shard_of(keys, shards):
+    """Stable shard number (0..shards-1) of every row's entity key"""
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy() % shards
+
+
+def latest_per_entity(df, join_keys, timestamp_field, created_field):
+    # Same semantics as feast materialize: only the newest row per entity reaches the online store
+    order = [timestamp_field] + ([created_field] if created_field else [])
+    return df.sort_values(order, kind="stable").drop_duplicates(subset=join_keys, keep="last")
+
+
+def materialize_shard(view_name, windows, shard, shards, batch_rows):
+    """Write the latest row per entity of one view shard over windows; returns (rows read, rows written, seconds)"""
+    started = time.perf_counter()
+    feature_view = _store.get_feature_view(view_name)
+    source = feature_view.batch_source
+    if not isinstance(source, FileSource):
+        raise ValueError(f"{view_name}: only FileSource views are supported, got {type(source).__name__}")
+
+    path = source.path if os.path.isabs(source.path) else os.path.join(_store.repo_path, source.path)
+    timestamp_field = source.timestamp_field
+    created_field = source.created_timestamp_column
+    join_keys = list(feature_view.join_keys)
+    columns = join_keys + [field.name for field in feature_view.features] + [timestamp_field]
+    if created_field:
+        columns.append(created_field)  # Feast's ingest path reads it from the written frame
+    dataset = ds.dataset(path, format="parquet")
+
+    # Windows bound the memory of a read; reading them oldest first keeps the reduction in time order
+    latest, rows_read = None, 0
+    for start, end in windows:
+        table = dataset.to_table(
+            columns=columns,
+            filter=(ds.field(timestamp_field) >= pa.scalar(start)) & (ds.field(timestamp_field) < pa.scalar(end))
+        )
+        if table.num_rows == 0:
+            continue
+        df = table.to_pandas()
+        if shards > 1:
+            df = df[shard_of(df[join_keys], shards) == shard]
+        rows_read += len(df)
+        if latest is not None:
+            df = pd.concat([latest, df], ignore_index=True)
+        latest = latest_per_entity(df, join_keys, timestamp_field, created_field)
+
+    if latest is None:
+        return rows_read, 0, time.perf_counter() - started
+    for offset in range(0, len(latest), batch_rows):
+        _store.write_to_online_store(view_name, latest.iloc[offset:offset + batch_rows])
+    return rows_read, len(latest), time.perf_counter() - started
+
+
+def run(views, end, start, window, workers, shards, batch_rows, repo_path=REPO_PATH,
+        watermarks_path=WATERMARKS_PATH, notifier=None):
+    store = FeatureStore(repo_path=repo_path)
+    watermarks = WatermarkStore(watermarks_path)
+
+    pending = {}  # view -> windows to read, oldest first
+    for view_name in views:
+        view_start = watermarks.get(view_name) or start
+        if view_start is None:
+            # Like materialize_incremental: with no history, go back one ttl
+            view_start = end - store.get_feature_view(view_name).ttl
+        windows = make_windows(view_start, end, window)
+        if windows:
+            pending[view_name] = windows
+    totals = {view_name: [0, 0, 0.0] for view_name in views}  # rows read, rows written, worker seconds
+    failed_views = set()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_store, initargs=(repo_path,)) as pool:
+        futures = {
+            pool.submit(materialize_shard, view_name, windows, shard, shards, batch_rows): (view_name, shard)
+            for view_name, windows in pending.items()
+            for shard in range(shards)
+        }
+        remaining = {view_name: shards for view_name in pending}
+        for future in as_completed(futures):
+            view_name, shard = futures[future]
+            try:
+                rows_read, rows_written, seconds = future.result()
+            except Exception as e:
+                failed_views.add(view_name)
+                print(f"❌ {view_name} shard {shard}/{shards}: {e}")
+                continue
+            totals[view_name][0] += rows_read
+            totals[view_name][1] += rows_written
+            totals[view_name][2] += seconds
+            print(f"   {view_name} shard {shard}/{shards}: {rows_read} rows read, {rows_written} written "
+                  f"in {seconds:.2f}s")
+
+            remaining[view_name] -= 1
+            if remaining[view_name] == 0 and view_name not in failed_views:
+                watermarks.advance(view_name, end)
+                if notifier is not None and totals[view_name][1]:
+                    notifier.notify(view_name)
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(written for _, written, _ in totals.values())
+    print(f"\n📊 Materialized {total_rows} rows in {elapsed:.1f}s "
+          f"({total_rows / elapsed:,.0f} rows/s, {workers} workers, {shards} shards per view)")
+    for view_name, (rows_read, rows_written, seconds) in totals.items():
+        rate = rows_written / seconds if seconds else 0.0
+        print(f"   {view_name}: {rows_read} rows read, {rows_written} written, {rate:,.0f} rows/s per worker, "
+              f"watermark {watermarks.get(view_name)}")
+    return not failed_views
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", nargs="+", default=FEATURE_VIEWS)
+    parser.add_argument("--start", type=datetime.fromisoformat,
+                        help="Start for views without a watermark (default: end minus the view's ttl)")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None, help="Default: now")
+    parser.add_argument("--window-hours", type=float, default=24, help="Hours of source rows read at a time")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, default=None,
+                        help="Entity-hash shards per view, written in parallel (default: --workers)")
+    parser.add_argument("--batch-rows", type=int, default=10000, help="Rows per online-store write (one pipeline)")
+    parser.add_argument("--repo-path", default=REPO_PATH)
+    parser.add_argument("--watermarks", default=WATERMARKS_PATH)
+    parser.add_argument("--notify-bootstrap-servers", default=os.getenv("KAFKA_BOOTSTRAP_SERVERS"),
+                        help="Kafka to announce written views on ml-features (default: $KAFKA_BOOTSTRAP_SERVERS)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    notifier = PushNotifier(args.notify_bootstrap_servers) if args.notify_bootstrap_servers else None
+    ok = run(
+        views=args.views,
+        end=args.end or datetime.utcnow(),
+        start=args.start,
+        window=timedelta(hours=args.window_hours),
+        workers=args.workers,
+        shards=args.shards or args.workers,
+        batch_rows=args.batch_rows,
+        repo_path=args.repo_path,
+        watermarks_path=args.watermarks,
+        notifier=notifier
+    )
+    if notifier is not None:
+        notifier.close()
+    raise SystemExit(0 if ok else 1)
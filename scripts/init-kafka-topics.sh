@@ -64,6 +64,9 @@ sleep 10
 # Create topics with production-ready configurations using positional parameters
 set -- "erp-events:3:1:604800000"  # 3 partitions, 1 replica, 7-day retention
 set -- "$@" "predictions-alerts:3:1:604800000"
+set -- "$@" "erp-events-dlq:1:1:2592000000"  # Rejected ERP events, 30-day retention
+set -- "$@" "erp-events-prediction-dlq:1:1:2592000000"  # Events prediction-service gave up on
+set -- "$@" "ml-features:3:1:86400000"  # Feature store push notifications
 
 for topic_config in "$@"; do
   IFS=':' read -r topic partitions replicas retention_ms <<< "$topic_config"
@@ -0,0 +1,201 @@
+import asyncio
+import ipaddress
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+import asyncpg
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "10000"))  # Rows held in memory; newer ones dropped past this
+AUDIT_FLUSH_ROWS = int(os.getenv("AUDIT_FLUSH_ROWS", "500"))  # Flush as soon as this many rows are waiting
+AUDIT_FLUSH_INTERVAL_MS = float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "1000"))  # ...or at least this often
+AUDIT_CONNECT_TIMEOUT_SECONDS = float(os.getenv("AUDIT_CONNECT_TIMEOUT_SECONDS", "5"))
+AUDIT_RECONNECT_MAX_SECONDS = float(os.getenv("AUDIT_RECONNECT_MAX_SECONDS", "30"))  # Backoff cap between attempts
+AUDIT_STOP_TIMEOUT_SECONDS = float(os.getenv("AUDIT_STOP_TIMEOUT_SECONDS", "10"))  # Time given to the last flushes
+AUDIT_DSN = os.getenv(
+    "AUDIT_DSN",
+    "postgresql://{user}:{password}@{host}:{port}/{db}".format(
+        user=os.getenv("POSTGRES_USER", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD", ""),
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=os.getenv("POSTGRES_PORT", "5432"),
+        db=os.getenv("POSTGRES_DB", "aurora_events"),
+    )
+)
+
+AUDIT_COLUMNS = ["request_id", "client_ip", "user_agent", "method", "path", "status_code", "response_time_ms",
+                 "created_at"]
+
+audit_rows_written = Counter('gateway_audit_rows_written_total', 'Audit rows copied into gateway_audit')
+audit_rows_dropped = Counter('gateway_audit_rows_dropped_total', 'Audit rows discarded instead of written', ['reason'])
+audit_buffer_depth = Gauge('gateway_audit_buffer_depth', 'Audit rows waiting to be flushed')
+
+class AuditWriter:
+    """Buffers audit rows in memory and writes them to gateway_audit with COPY in the background.
+
+    record() never waits on the database: when the buffer is full the row is
+    dropped and counted. A flush runs every AUDIT_FLUSH_INTERVAL_MS or once
+    AUDIT_FLUSH_ROWS rows are waiting, whichever comes first.
+
+    The connection pool is opened by the background task, with a timeout and
+    backoff between attempts, so neither startup nor requests wait on an
+    unreachable database; rows stay buffered until it is reachable.
+    """
+
+    def __init__(self, dsn: str = AUDIT_DSN, buffer_size: int = AUDIT_BUFFER_SIZE,
+                 flush_rows: int = AUDIT_FLUSH_ROWS, flush_interval_ms: float = AUDIT_FLUSH_INTERVAL_MS):
+        self.dsn = dsn
+        self.buffer_size = buffer_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self._buffer = deque()
+        self._flush_now = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._pool = None
+        self._task = None
+        audit_buffer_depth.set_function(lambda: len(self._buffer))
+
+    def record(self, row: tuple):
+        if len(self._buffer) >= self.buffer_size:
+            audit_rows_dropped.labels(reason="buffer_full").inc()
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self.flush_rows:
+            self._flush_now.set()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def connect(self) -> bool:
+        """Open the connection pool; False (and logged) if the database cannot be reached in time"""
+        try:
+            self._pool = await asyncio.wait_for(
+                asyncpg.create_pool(self.dsn, min_size=1, max_size=2, timeout=AUDIT_CONNECT_TIMEOUT_SECONDS),
+                timeout=AUDIT_CONNECT_TIMEOUT_SECONDS
+            )
+            return True
+        except Exception as e:
+            # Auditing is best effort; the gateway keeps serving without it
+            logger.error("Audit database unavailable, rows stay buffered: %s %s", type(e).__name__, e)
+            return False
+
+    async def stop(self):
+        """Finish the flush in progress and write what is still buffered, within AUDIT_STOP_TIMEOUT_SECONDS"""
+        if self._task is not None:
+            self._stopping.set()
+            self._flush_now.set()
+            try:
+                # A timeout cancels the task; flush() counts the rows it was writing as dropped
+                await asyncio.wait_for(self._task, timeout=AUDIT_STOP_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.error("Audit writer did not stop in time")
+            self._task = None
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self._buffer:
+            audit_rows_dropped.labels(reason="shutdown").inc(len(self._buffer))
+            self._buffer.clear()
+
+    async def _run(self):
+        delay = 1.0
+        while self._pool is None and not self._stopping.is_set():
+            if await self.connect():
+                break
+            await _wait(self._stopping, delay)
+            delay = min(delay * 2, AUDIT_RECONNECT_MAX_SECONDS)
+
+        while not self._stopping.is_set():
+            await _wait(self._flush_now, self.flush_interval)
+            self._flush_now.clear()
+            await self.flush()
+        # Drain what arrived before shutdown
+        while self._buffer and self._pool is not None:
+            await self.flush()
+
+    async def flush(self):
+        if self._pool is None:
+            return  # Rows stay buffered until the database is reachable
+        rows = []
+        while self._buffer and len(rows) < self.buffer_size:
+            rows.append(self._buffer.popleft())
+        if not rows:
+            return
+        try:
+            async with self._pool.acquire() as connection:
+                await connection.copy_records_to_table(
+                    "gateway_audit", records=[_to_record(row) for row in rows], columns=AUDIT_COLUMNS
+                )
+            audit_rows_written.inc(len(rows))
+        except asyncio.CancelledError:
+            audit_rows_dropped.labels(reason="shutdown").inc(len(rows))
+            raise
+        except Exception as e:
+            audit_rows_dropped.labels(reason="write_failed").inc(len(rows))
+            logger.error("Audit flush failed, dropped %d rows: %s", len(rows), e)
+
+async def _wait(event: asyncio.Event, timeout: float):
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+def _to_record(row: tuple) -> tuple:
+    # Parsing and truncation happen here, off the request path
+    request_id, client_ip, user_agent, method, path, status_code, response_time_ms, created_at = row
+    return ((request_id or uuid.uuid4().hex)[:100], _inet(client_ip), user_agent, method[:10], path[:500],
+            status_code, response_time_ms, datetime.fromtimestamp(created_at, timezone.utc))
+
+def _inet(host):
+    try:
+        return ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+class AuditMiddleware:
+    """ASGI middleware handing one audit row per HTTP request to an AuditWriter"""
+
+    def __init__(self, app, writer: AuditWriter):
+        self.app = app
+        self.writer = writer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500  # Reported if the app fails before starting a response
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_id = user_agent = None
+            for name, value in scope["headers"]:
+                if name == b"x-request-id":
+                    request_id = value.decode("latin-1")
+                elif name == b"user-agent":
+                    user_agent = value.decode("latin-1")
+            client = scope.get("client")
+            self.writer.record((
+                request_id,
+                client[0] if client else None,
+                user_agent,
+                scope["method"],
+                scope["path"],
+                status_code,
+                int((time.perf_counter() - started) * 1000),
+                time.time(),
+            ))
@@ -3,7 +3,12 @@ from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status  # Import Depends, HTTPException, and status
 from fastapi.security import OAuth2PasswordBearer  # Import OAuth2PasswordBearer
 from dotenv import load_dotenv  # Import load_dotenv
+from prometheus_client import Counter, Gauge
+from collections import OrderedDict
+import hashlib
 import os
+import threading
+import time
 load_dotenv()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")  # Set in .env
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")  # Define oauth2_scheme
@@ -12,6 +17,10 @@ if not SECRET_KEY:
     raise ValueError("JWT_SECRET_KEY environment variable is not set")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))  # Verified tokens kept; 0 disables the cache
+JWT_CACHE_MAX_TTL_SECONDS = float(os.getenv("JWT_CACHE_MAX_TTL_SECONDS", "300"))  # Cap for tokens without exp
+
+jwt_cache_lookups = Counter('gateway_jwt_cache_lookups_total', 'Verified-token cache lookups', ['result'])
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -22,11 +31,79 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
+class VerifiedTokenCache:
+    """LRU of token digest -> decoded claims, so repeat callers skip signature checks.
+
+    Entries expire with the token's own exp claim. Only successfully verified
+    tokens are stored; failures always go through jwt.decode again.
+    """
+
+    def __init__(self, max_size: int, max_ttl_seconds: float):
+        self.max_size = max_size
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries = OrderedDict()  # digest -> (claims, expires_at)
+        self._lock = threading.Lock()  # Sync dependencies run on the threadpool
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                jwt_cache_lookups.labels(result="hit").inc()
+                return entry[0]
+            if entry is not None:
+                del self._entries[digest]
+            self.misses += 1
+        jwt_cache_lookups.labels(result="miss").inc()
+        return None
+
+    def put(self, token: str, claims: dict):
+        expires_at = time.time() + self.max_ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = (claims, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(JWT_CACHE_SIZE, JWT_CACHE_MAX_TTL_SECONDS)
+Gauge('gateway_jwt_cache_hit_ratio',
+      'Share of token verifications served from cache').set_function(token_cache.hit_ratio)
+
+def decode_token(token: str):
     if not SECRET_KEY:
         raise ValueError("SECRET_KEY is not set")
     return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
+def verify_token(token: str):
+    if token_cache.max_size <= 0:
+        return decode_token(token)
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)  # Raises JWTError (incl. expiry) before anything is cached
+        token_cache.put(token, claims)
+    return dict(claims)
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
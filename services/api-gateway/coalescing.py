@@ -0,0 +1,78 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, NamedTuple
+from fastapi import Request
+from prometheus_client import Counter
+
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "2"))  # 0 keeps coalescing only
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+
+prediction_lookups = Counter(
+    'gateway_prediction_lookups_total',
+    'Stock-out prediction requests by where the answer came from',
+    ['source']  # cache, coalesced or upstream
+)
+
+class UpstreamResponse(NamedTuple):
+    status_code: int
+    content: bytes
+    media_type: str
+
+class SingleFlightCache:
+    """Merges concurrent calls for the same key into one and keeps successful results briefly.
+
+    The first caller for a key starts the fetch as its own task; later callers
+    await the same task, so a client disconnecting does not cancel the call
+    for everyone else waiting on it.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._inflight = {}  # key -> asyncio.Task
+        self._results = OrderedDict()  # key -> (expires_at, result)
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                  cacheable: Callable[[Any], bool] = lambda result: True):
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._results.move_to_end(key)
+                prediction_lookups.labels(source="cache").inc()
+                return cached[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch, cacheable))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+            prediction_lookups.labels(source="upstream").inc()
+        else:
+            prediction_lookups.labels(source="coalesced").inc()
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, fetch, cacheable):
+        try:
+            result = await fetch()
+            if self.ttl_seconds > 0 and cacheable(result):
+                self._results[key] = (time.monotonic() + self.ttl_seconds, result)
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_size:
+                    self._results.popitem(last=False)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+def _consume_exception(task: asyncio.Task):
+    # Every waiter may have gone away; don't log "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+def create_prediction_cache() -> SingleFlightCache:
+    return SingleFlightCache(PREDICTION_CACHE_TTL_SECONDS, PREDICTION_CACHE_SIZE)
+
+def get_prediction_cache(request: Request) -> SingleFlightCache:
+    return request.app.state.prediction_cache
@@ -5,17 +5,38 @@ from prometheus_fastapi_instrumentator import Instrumentator
 from jose import JWTError, jwt
 from pydantic import BaseModel
 from typing import Optional
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 from auth import verify_token
+from upstream import create_upstream_client
+from coalescing import create_prediction_cache
+from audit import AUDIT_ENABLED, AuditMiddleware, AuditWriter
 from routes import health, predictions
 
 load_dotenv()
 
+audit_writer = AuditWriter()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for all proxied prediction calls
+    app.state.upstream_client = create_upstream_client()
+    app.state.prediction_cache = create_prediction_cache()
+    if AUDIT_ENABLED:
+        await audit_writer.start()
+    try:
+        yield
+    finally:
+        await app.state.upstream_client.aclose()
+        if AUDIT_ENABLED:
+            await audit_writer.stop()
+
 app = FastAPI(
     title="Aurora API Gateway",
     description="API Gateway for Aurora System of Intelligence",
-    version=os.getenv("API_VERSION", "v1alpha1")
+    version=os.getenv("API_VERSION", "v1alpha1"),
+    lifespan=lifespan
 )
 
 # Enable Prometheus metrics
@@ -30,6 +51,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Audit rows are buffered and written to gateway_audit in the background
+if AUDIT_ENABLED:
+    app.add_middleware(AuditMiddleware, writer=audit_writer)
+
 # OAuth2 scheme for JWT
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/token")
 
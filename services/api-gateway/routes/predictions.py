@@ -1,7 +1,15 @@
 from fastapi import APIRouter, Depends
-from ..auth import get_current_user
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from auth import get_current_user
+from upstream import UPSTREAM_BATCH_TIMEOUT, get_upstream_client
+from coalescing import SingleFlightCache, UpstreamResponse, get_prediction_cache
+from pydantic import BaseModel, Field
+from typing import List
 import httpx
+import os
+
+PREDICTION_BATCH_MAX_ITEMS = int(os.getenv("PREDICTION_BATCH_MAX_ITEMS", "5000"))
 
 router = APIRouter(tags=["Predictions"])
 
@@ -9,13 +17,43 @@ class PredictionRequest(BaseModel):
     entity_id: str
     entity_type: str
 
+class BatchPredictionRequest(BaseModel):
+    items: List[PredictionRequest] = Field(..., min_length=1, max_length=PREDICTION_BATCH_MAX_ITEMS)
+
 @router.post("/predictions/stock-out")
-async def predict_stock_out(request: PredictionRequest, current_user: dict = Depends(get_current_user)):
-    async with httpx.AsyncClient() as client:
-        # Forward to prediction-service (to be implemented)
+async def predict_stock_out(request: PredictionRequest, current_user: dict = Depends(get_current_user),
+                            client: httpx.AsyncClient = Depends(get_upstream_client),
+                            cache: SingleFlightCache = Depends(get_prediction_cache)):
+    # Identical concurrent requests (dashboard polling) share one upstream call and a short-lived result
+    async def fetch():
         response = await client.post(
-            "http://prediction-service:8001/predict/stock-out",
+            "/predict/stock-out",
             json={"entity_id": request.entity_id, "entity_type": request.entity_type}
         )
-        return response.json()
-    
\ No newline at end of file
+        return UpstreamResponse(response.status_code, response.content, response.headers.get("content-type"))
+
+    result = await cache.get(
+        (request.entity_type, request.entity_id),
+        fetch,
+        cacheable=lambda result: result.status_code == 200
+    )
+    return Response(content=result.content, status_code=result.status_code, media_type=result.media_type)
+
+@router.post("/predictions/stock-out:batch")
+async def predict_stock_out_batch(request: BatchPredictionRequest, current_user: dict = Depends(get_current_user),
+                                  client: httpx.AsyncClient = Depends(get_upstream_client)):
+    # One upstream call for the whole batch; the prediction service does one feature lookup and one predict
+    upstream_request = client.build_request(
+        "POST",
+        "/predict/stock-out:batch",
+        json=request.model_dump(),
+        timeout=UPSTREAM_BATCH_TIMEOUT
+    )
+    response = await client.send(upstream_request, stream=True)
+    # Decoded bytes: the upstream content-encoding and content-length are not forwarded
+    return StreamingResponse(
+        response.aiter_bytes(),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type"),
+        background=BackgroundTask(response.aclose)
+    )
@@ -0,0 +1,169 @@
+"""Latency benchmark for the stock-out prediction proxy against a local stub upstream.
+
+Runs a stub prediction service and the gateway on localhost, each in its own
+process, then drives POST /predictions/stock-out with concurrent clients
+through three runs: "legacy" opens an httpx.AsyncClient per request (the previous handler),
+"pooled" is the production route (shared client, request coalescing and the
+short-TTL response cache) over --entities ids, and "uncached" is the same route
+on a second gateway with PREDICTION_CACHE_TTL_SECONDS=0 and a distinct entity id
+per request, so every call goes upstream and only the shared client is measured.
+Reports p50/p99 per run and how many calls actually reached the upstream.
+
+    python scripts/benchmark_prediction_proxy.py --requests 5000 --concurrency 50
+    python scripts/benchmark_prediction_proxy.py --entities 5 --upstream-latency-ms 50  # dashboard storm
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+GATEWAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GATEWAY_DIR)
+
+UPSTREAM_PORT = 18001
+GATEWAY_PORT = 18000
+UNCACHED_GATEWAY_PORT = 18002
+os.environ.setdefault("PREDICTION_SERVICE_URL", f"http://127.0.0.1:{UPSTREAM_PORT}")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+from routes.predictions import PredictionRequest  # noqa: E402
+
+
+def build_stub(latency_seconds: float = 0.0) -> FastAPI:
+    stub = FastAPI()
+    stub.state.calls = 0
+
+    @stub.get("/calls")
+    async def stub_calls():
+        return {"calls": stub.state.calls}
+
+    @stub.post("/predict/stock-out")
+    async def stub_predict(request: PredictionRequest):
+        stub.state.calls += 1
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        return {
+            "entity_id": request.entity_id,
+            "entity_type": request.entity_type,
+            "stock_out_probability": 0.12,
+            "predicted_demand": 42.0,
+            "model_version": "benchmark",
+        }
+
+    return stub
+
+
+def build_gateway(cache_ttl_seconds=None) -> FastAPI:
+    import coalescing
+    from auth import get_current_user
+    from main import app
+
+    if cache_ttl_seconds is not None:
+        # Read when the app starts, so this acts like setting PREDICTION_CACHE_TTL_SECONDS
+        coalescing.PREDICTION_CACHE_TTL_SECONDS = cache_ttl_seconds
+
+    @app.post("/legacy/predictions/stock-out")
+    async def legacy_predict_stock_out(request: PredictionRequest):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{os.environ['PREDICTION_SERVICE_URL']}/predict/stock-out",
+                json={"entity_id": request.entity_id, "entity_type": request.entity_type}
+            )
+            return response.json()
+
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "benchmark"}
+    return app
+
+
+def serve(builder, port, *args):
+    uvicorn.run(builder(*args), host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=60)
+
+
+async def wait_until_up(port):
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(f"http://127.0.0.1:{port}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+
+async def upstream_calls():
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"http://127.0.0.1:{UPSTREAM_PORT}/calls")
+        return response.json()["calls"]
+
+
+async def drive(port, path, total, concurrency, entities):
+    latencies = []
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        async def worker():
+            for i in remaining:
+                started = time.perf_counter()
+                payload = {"entity_id": f"PROD-{i % entities:03d}", "entity_type": "product"}
+                response = await client.post(path, json=payload)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return latencies, elapsed
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--entities", type=int, default=50, help="Distinct entity ids requested")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # Upstream and gateway each get their own process so the driver does not compete with them
+    context = multiprocessing.get_context("spawn")
+    servers = [
+        context.Process(target=serve, args=(build_stub, UPSTREAM_PORT, args.upstream_latency_ms / 1e3), daemon=True),
+        context.Process(target=serve, args=(build_gateway, GATEWAY_PORT), daemon=True),
+        context.Process(target=serve, args=(build_gateway, UNCACHED_GATEWAY_PORT, 0.0), daemon=True),
+    ]
+    for server in servers:
+        server.start()
+    try:
+        await wait_until_up(UPSTREAM_PORT)
+        await wait_until_up(GATEWAY_PORT)
+        await wait_until_up(UNCACHED_GATEWAY_PORT)
+        api_prefix = f"/api/{os.getenv('API_VERSION', 'v1alpha1')}"
+        runs = (
+            ("legacy", GATEWAY_PORT, "/legacy/predictions/stock-out", args.entities),
+            ("pooled", GATEWAY_PORT, f"{api_prefix}/predictions/stock-out", args.entities),
+            ("uncached", UNCACHED_GATEWAY_PORT, f"{api_prefix}/predictions/stock-out", args.requests),
+        )
+        for label, port, path, entities in runs:
+            await drive(port, path, min(args.requests, 200), args.concurrency, entities)  # warm-up
+            calls_before = await upstream_calls()
+            latencies, elapsed = await drive(port, path, args.requests, args.concurrency, entities)
+            calls = await upstream_calls() - calls_before
+            print(f"{label:<8} p50 {percentile(latencies, 0.50) * 1e3:7.2f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1e3:7.2f} ms  {args.requests / elapsed:8.0f} req/s  "
+                  f"{calls:6d} upstream calls")
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
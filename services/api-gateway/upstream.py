@@ -0,0 +1,28 @@
+import os
+import httpx
+from fastapi import Request
+
+PREDICTION_SERVICE_URL = os.getenv("PREDICTION_SERVICE_URL", "http://prediction-service:8001")
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "200"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "50"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "2"))
+UPSTREAM_BATCH_TIMEOUT = float(os.getenv("UPSTREAM_BATCH_TIMEOUT", "60"))  # Batch predictions score thousands of rows
+
+def create_upstream_client() -> httpx.AsyncClient:
+    """Application-wide client for the prediction service; connections are pooled and kept alive"""
+    return httpx.AsyncClient(
+        base_url=PREDICTION_SERVICE_URL,
+        http2=UPSTREAM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(UPSTREAM_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT),
+    )
+
+def get_upstream_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.upstream_client
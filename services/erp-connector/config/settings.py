@@ -0,0 +1,42 @@
+import os
+
+# Kafka
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "20"))  # Wait up to this long to fill a batch
+KAFKA_MAX_BATCH_SIZE = int(os.getenv("KAFKA_MAX_BATCH_SIZE", "65536"))  # Bytes per partition batch
+KAFKA_COMPRESSION_TYPE = os.getenv("KAFKA_COMPRESSION_TYPE", "gzip")
+# "json" or "avro". Avro records are smaller but cost more CPU per event (about 28.6 vs 20.0 us in
+# scripts/benchmark_serialization.py), since payload is still a JSON string inside the record. Its
+# EventType enum also sends any event type it does not list to DEAD_LETTER_TOPIC, where JSON passes it through.
+KAFKA_SERIALIZATION = os.getenv("KAFKA_SERIALIZATION", "json")
+ERP_EVENT_SCHEMA_PATH = os.getenv(
+    "ERP_EVENT_SCHEMA_PATH",
+    # Shipped with the service; keep in sync with infrastructure/kafka/schemas/erp-event.avsc
+    os.path.join(os.path.dirname(__file__), "..", "src", "schemas", "erp-event.avsc")
+)
+DEAD_LETTER_TOPIC = os.getenv("DEAD_LETTER_TOPIC", "erp-events-dlq")  # Events that cannot be encoded
+ERP_EVENT_SCHEMA_ID = int(os.getenv("ERP_EVENT_SCHEMA_ID", "1"))  # Registry id framed into every Avro record
+PUBLISH_LANES = int(os.getenv("PUBLISH_LANES", "8"))  # Ordered lanes, keyed by entity_id
+PUBLISH_MAX_IN_FLIGHT = int(os.getenv("PUBLISH_MAX_IN_FLIGHT", "1000"))  # Unacked records across all lanes
+
+# ERP
+ERP_BASE_URL = os.getenv("ERP_BASE_URL", "http://localhost:8080")
+ERP_AUTH_TOKEN = os.getenv("ERP_AUTH_TOKEN", "")
+ERP_SIMULATION_MODE = os.getenv("ERP_SIMULATION_MODE", "true").lower() == "true"
+ERP_PAGE_SIZE = int(os.getenv("ERP_PAGE_SIZE", "500"))
+ERP_MAX_PAGES_PER_POLL = int(os.getenv("ERP_MAX_PAGES_PER_POLL", "20"))
+ERP_MAX_CONNECTIONS = int(os.getenv("ERP_MAX_CONNECTIONS", "20"))
+ERP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("ERP_MAX_CONNECTIONS_PER_HOST", "10"))
+ERP_DNS_CACHE_TTL_SECONDS = int(os.getenv("ERP_DNS_CACHE_TTL_SECONDS", "300"))
+ERP_KEEPALIVE_TIMEOUT_SECONDS = float(os.getenv("ERP_KEEPALIVE_TIMEOUT_SECONDS", "30"))
+ERP_REQUEST_TIMEOUT_SECONDS = float(os.getenv("ERP_REQUEST_TIMEOUT_SECONDS", "30"))
+POLL_INTERVAL_SECONDS = int(os.getenv("POLL_INTERVAL_SECONDS", "30"))
+POLL_MIN_INTERVAL_SECONDS = float(os.getenv("POLL_MIN_INTERVAL_SECONDS", "1"))  # While catching up a backlog
+POLL_MAX_INTERVAL_SECONDS = float(os.getenv("POLL_MAX_INTERVAL_SECONDS", "300"))  # Upper bound for idle/error backoff
+POLL_BACKOFF_FACTOR = float(os.getenv("POLL_BACKOFF_FACTOR", "2"))
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.2"))  # Fraction of the interval randomly shaved off
+
+# Change capture
+# Must outlive the container (k8s mounts a PersistentVolumeClaim here), or a restart re-reads the whole ERP history
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "/var/lib/erp-connector/checkpoint.db")
+DEDUP_CACHE_SIZE = int(os.getenv("DEDUP_CACHE_SIZE", "100000"))  # Recently published event ids to remember
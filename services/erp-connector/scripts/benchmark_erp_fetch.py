@@ -0,0 +1,126 @@
+"""Benchmark paged ERP event fetching against a local fake ERP server.
+
+Starts an aiohttp server that serves deterministic, paged sale-order events
+and drains it through ERPClient, reporting throughput and peak RSS.
+
+    python scripts/benchmark_erp_fetch.py --events 200000 --mode stream
+    python scripts/benchmark_erp_fetch.py --events 200000 --mode collect
+    python scripts/benchmark_erp_fetch.py --serve --port 8089
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, os.path.join(SERVICE_DIR, "src"))
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def fake_event(index: int) -> dict:
+    order = f"SO-2024-{index:08d}"
+    return {
+        "id": f"event_{index:08d}",
+        "type": "SALE_ORDER_CREATED",
+        "entity_id": order,
+        "timestamp": (EPOCH + timedelta(seconds=index)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "data": {
+            "order_number": order,
+            "customer_id": f"CUST-{index % 1000:03d}",
+            "total_amount": 1500.00,
+            "items": [
+                {"product_id": f"PROD-{index % 50 + 1:03d}", "quantity": 2, "price": 500.00},
+                {"product_id": f"PROD-{(index + 7) % 50 + 1:03d}", "quantity": 1, "price": 500.00}
+            ]
+        }
+    }
+
+
+def make_app(total_events: int) -> web.Application:
+    """Fake ERP events API: GET /events?limit=&since_id=&cursor= ordered by (timestamp, id)"""
+    async def events(request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", "500"))
+        if "cursor" in request.query:
+            start = int(request.query["cursor"])
+        elif "since_id" in request.query:
+            start = int(request.query["since_id"].split("_")[1]) + 1
+        else:
+            start = 0
+        end = min(start + limit, total_events)
+        return web.json_response({
+            "events": [fake_event(i) for i in range(start, end)],
+            "next_cursor": str(end) if end < total_events else None
+        })
+
+    app = web.Application()
+    app.router.add_get("/events", events)
+    return app
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drain(mode: str) -> int:
+    from erp_client import ERPClient
+
+    client = ERPClient()
+    await client.start()
+    try:
+        if mode == "collect":
+            # Materialize the whole backfill before handing it on, as a list-returning fetch would
+            events = [event async for page in client.get_recent_events() for event in page]
+            return len(events)
+        count = 0
+        async for page in client.get_recent_events():
+            count += len(page)
+        return count
+    finally:
+        await client.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--mode", choices=["stream", "collect"], default="stream")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--serve", action="store_true", help="Only run the fake ERP server")
+    args = parser.parse_args()
+
+    runner = web.AppRunner(make_app(args.events))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    try:
+        if args.serve:
+            print(f"Fake ERP serving {args.events} events on http://127.0.0.1:{args.port}/events")
+            await asyncio.Event().wait()
+
+        os.environ.update(
+            ERP_BASE_URL=f"http://127.0.0.1:{args.port}",
+            ERP_SIMULATION_MODE="false",
+            ERP_PAGE_SIZE=str(args.page_size),
+            # Drain the whole backfill in one call
+            ERP_MAX_PAGES_PER_POLL=str(args.events // args.page_size + 1),
+        )
+        baseline_rss = peak_rss_mb()
+        started = time.perf_counter()
+        count = await drain(args.mode)
+        elapsed = time.perf_counter() - started
+        assert count == args.events, f"fetched {count} of {args.events} events"
+        print(f"{args.mode:<8} {count:>8} events  {elapsed:8.3f}s  {count / elapsed:>10.0f} events/sec  "
+              f"peak RSS {peak_rss_mb():.1f} MiB (+{peak_rss_mb() - baseline_rss:.1f})")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
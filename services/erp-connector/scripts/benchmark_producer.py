@@ -0,0 +1,182 @@
+"""Benchmark ERP event publishing against an in-process Kafka broker stub.
+
+Compares the legacy per-event start/send_and_wait/stop pattern with the
+long-lived, pipelined KafkaProducer and the LanePublisher used by ERPConnector.
+
+    python scripts/benchmark_producer.py --events 2000 --rtt-ms 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, os.path.join(SERVICE_DIR, "src"))
+
+from main import KafkaProducer, LanePublisher  # noqa: E402
+
+
+class StubBrokerProducer:
+    """AIOKafkaProducer stand-in that simulates broker round-trips and batching"""
+
+    def __init__(self, rtt: float, linger_ms: int = 0, max_batch_size: int = 16384):
+        self.rtt = rtt
+        self.linger = linger_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.delivered = 0
+        self._pending = []
+        self._pending_bytes = 0
+        self._timer = None
+        self._in_flight = set()
+
+    async def start(self):
+        # Bootstrap connection + metadata fetch
+        await asyncio.sleep(self.rtt * 2)
+
+    async def stop(self):
+        await self.flush()
+        await asyncio.sleep(self.rtt)
+
+    async def send(self, topic, key=None, value=None):
+        ack = asyncio.get_running_loop().create_future()
+        self._pending.append(ack)
+        self._pending_bytes += len(key or b"") + len(value or b"")
+        if self._pending_bytes >= self.max_batch_size:
+            self._ship()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._linger())
+        return ack
+
+    async def send_and_wait(self, topic, key=None, value=None):
+        return await (await self.send(topic, key=key, value=value))
+
+    async def flush(self):
+        if self._pending:
+            self._ship()
+        if self._in_flight:
+            await asyncio.gather(*list(self._in_flight))
+
+    async def _linger(self):
+        await asyncio.sleep(self.linger)
+        self._ship()
+
+    def _ship(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        task = asyncio.create_task(self._deliver(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _deliver(self, batch):
+        await asyncio.sleep(self.rtt)
+        for ack in batch:
+            if not ack.done():
+                ack.set_result(None)
+        self.delivered += len(batch)
+
+
+def make_events(count: int):
+    """Sale-order events in the format produced by ERPConnector._transform_event"""
+    return [
+        {
+            "event_id": f"event_{i:06d}",
+            "event_type": "SALE_ORDER_CREATED",
+            "entity_id": f"SO-2024-{i % 500:04d}",
+            "timestamp": "2024-01-15T10:30:00Z",
+            "payload": {
+                "order_number": f"SO-2024-{i % 500:04d}",
+                "customer_id": "CUST-123",
+                "total_amount": 1500.00,
+                "items": [
+                    {"product_id": "PROD-001", "quantity": 2, "price": 500.00},
+                    {"product_id": "PROD-002", "quantity": 1, "price": 500.00}
+                ]
+            },
+            "source_system": "jde_erp",
+            "version": "1.0"
+        }
+        for i in range(count)
+    ]
+
+
+async def run_legacy(events, rtt):
+    """Per-event producer lifecycle, as KafkaProducer.publish used to do"""
+    broker = StubBrokerProducer(rtt)
+    for event in events:
+        await broker.start()
+        try:
+            await broker.send_and_wait(
+                "erp-events",
+                key=event["entity_id"].encode("utf-8"),
+                value=json.dumps(event).encode("utf-8"),
+            )
+        finally:
+            await broker.stop()
+    return broker.delivered
+
+
+async def run_pooled(events, rtt, linger_ms, max_batch_size):
+    broker = StubBrokerProducer(rtt, linger_ms=linger_ms, max_batch_size=max_batch_size)
+    producer = KafkaProducer(producer=broker)
+    await producer.start()
+    try:
+        # Pipeline every record, then wait for all broker acks
+        acks = [await producer.send("erp-events", event["entity_id"], event) for event in events]
+        await asyncio.gather(*acks)
+    finally:
+        await producer.stop()
+    return broker.delivered
+
+
+async def run_laned(events, rtt, linger_ms, max_batch_size, lanes, max_in_flight):
+    broker = StubBrokerProducer(rtt, linger_ms=linger_ms, max_batch_size=max_batch_size)
+    producer = KafkaProducer(producer=broker)
+    publisher = LanePublisher(producer, lanes=lanes, max_in_flight=max_in_flight)
+    await producer.start()
+    try:
+        await publisher.publish("erp-events", events)
+    finally:
+        await producer.stop()
+    return broker.delivered
+
+
+async def timed(label, coro, count):
+    started = time.perf_counter()
+    delivered = await coro
+    elapsed = time.perf_counter() - started
+    assert delivered == count, f"{label}: delivered {delivered} of {count}"
+    rate = count / elapsed
+    print(f"{label:<8} {count:>7} events  {elapsed:8.3f}s  {rate:>10.0f} events/sec")
+    return rate
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Simulated broker round-trip time")
+    parser.add_argument("--linger-ms", type=int, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=65536)
+    parser.add_argument("--lanes", type=int, default=8)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    args = parser.parse_args()
+
+    rtt = args.rtt_ms / 1000
+    events = make_events(args.events)
+
+    before = await timed("legacy", run_legacy(events, rtt), len(events))
+    after = await timed("pooled", run_pooled(events, rtt, args.linger_ms, args.max_batch_size), len(events))
+    laned = await timed(
+        "laned",
+        run_laned(events, rtt, args.linger_ms, args.max_batch_size, args.lanes, args.max_in_flight),
+        len(events)
+    )
+    print(f"speedup  {after / before:.1f}x pooled, {laned / before:.1f}x laned")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
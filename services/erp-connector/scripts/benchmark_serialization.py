@@ -0,0 +1,92 @@
+"""Compare JSON and Avro encoding of erp-events records.
+
+Reports bytes per record and encode/decode time per record for realistic
+sale-order events, using the same serializers as ERPConnector.
+
+    python scripts/benchmark_serialization.py --events 20000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+from fastavro import schemaless_reader
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, os.path.join(SERVICE_DIR, "src"))
+
+from avro_serde import HEADER, ERPEventSerializer  # noqa: E402
+from config import settings  # noqa: E402
+from main import json_serializer  # noqa: E402
+
+
+def make_events(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        items = [
+            {
+                "product_id": f"PROD-{rng.randint(1, 50):03d}",
+                "quantity": rng.randint(1, 20),
+                "price": round(rng.uniform(10, 100), 2)
+            }
+            for _ in range(rng.randint(1, 8))
+        ]
+        events.append({
+            "event_id": f"event_{i:08d}",
+            "event_type": "SALE_ORDER_CREATED",
+            "entity_id": f"SO-2024-{i:06d}",
+            "timestamp": f"2024-01-15T10:{i // 60 % 60:02d}:{i % 60:02d}Z",
+            "payload": {
+                "order_number": f"SO-2024-{i:06d}",
+                "customer_id": f"CUST-{rng.randint(1, 500):03d}",
+                "total_amount": round(sum(item["quantity"] * item["price"] for item in items), 2),
+                "items": items
+            },
+            "source_system": "jde_erp",
+            "version": "1.0"
+        })
+    return events
+
+
+def measure(label, encode, decode, events):
+    started = time.perf_counter()
+    encoded = [encode(event) for event in events]
+    encode_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for value in encoded:
+        decode(value)
+    decode_time = time.perf_counter() - started
+
+    size = sum(len(value) for value in encoded) / len(encoded)
+    per_event = 1e6 / len(events)
+    print(f"{label:<6} {size:8.1f} B/event  encode {encode_time * per_event:6.2f} us  "
+          f"decode {decode_time * per_event:6.2f} us")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    serializer = ERPEventSerializer(settings.ERP_EVENT_SCHEMA_PATH, settings.ERP_EVENT_SCHEMA_ID)
+
+    def avro_decode(value):
+        record = schemaless_reader(io.BytesIO(value[HEADER.size:]), serializer.schema)
+        record["payload"] = json.loads(record["payload"])
+        return record
+
+    json_size = measure("json", json_serializer, json.loads, events)
+    avro_size = measure("avro", serializer, avro_decode, events)
+    print(f"avro payload is {avro_size / json_size:.0%} of json")
+
+
+if __name__ == "__main__":
+    main()
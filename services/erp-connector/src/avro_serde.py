@@ -0,0 +1,39 @@
+import io
+import json
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict
+from fastavro import parse_schema, schemaless_writer
+
+# Confluent wire format: magic byte, 4-byte big-endian schema id, Avro body
+MAGIC_BYTE = 0
+HEADER = struct.Struct(">bI")
+
+def load_schema(path: str) -> dict:
+    """Parse an .avsc file once; the parsed schema is reused for every record"""
+    with open(path) as f:
+        return parse_schema(json.load(f))
+
+class ERPEventSerializer:
+    """Encodes standard Aurora events as framed Avro ERPEvent records"""
+    def __init__(self, schema_path: str, schema_id: int):
+        self.schema = load_schema(schema_path)
+        self.header = HEADER.pack(MAGIC_BYTE, schema_id)
+    
+    def __call__(self, event: Dict[str, Any]) -> bytes:
+        buffer = io.BytesIO()
+        buffer.write(self.header)
+        schemaless_writer(buffer, self.schema, self.to_record(event))
+        return buffer.getvalue()
+    
+    @staticmethod
+    def to_record(event: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = datetime.fromisoformat(event["timestamp"]).astimezone(timezone.utc)
+        return {
+            "eventId": event["event_id"],
+            "eventType": event["event_type"],
+            "entityId": event["entity_id"],
+            "timestamp": int(timestamp.timestamp() * 1000),
+            "payload": json.dumps(event.get("payload", {}), separators=(",", ":")),
+            "sourceSystem": event["source_system"]
+        }
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+from structlog import get_logger
+
+logger = get_logger()
+
+class Watermark(NamedTuple):
+    """Position of the last published ERP event; events are ordered by (timestamp, id)"""
+    timestamp: str
+    event_id: str
+
+class WatermarkStore:
+    """Persists the ERP change-capture high-watermark in a local SQLite file"""
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermark ("
+            " source TEXT PRIMARY KEY,"
+            " event_timestamp TEXT NOT NULL,"
+            " event_id TEXT NOT NULL)"
+        )
+        self.conn.commit()
+    
+    def load(self, source: str) -> Optional[Watermark]:
+        row = self.conn.execute(
+            "SELECT event_timestamp, event_id FROM watermark WHERE source = ?", (source,)
+        ).fetchone()
+        return Watermark(*row) if row else None
+    
+    def save(self, source: str, watermark: Watermark):
+        self.conn.execute(
+            "INSERT INTO watermark (source, event_timestamp, event_id) VALUES (?, ?, ?) "
+            "ON CONFLICT(source) DO UPDATE SET event_timestamp = excluded.event_timestamp, "
+            "event_id = excluded.event_id",
+            (source, watermark.timestamp, watermark.event_id)
+        )
+        self.conn.commit()
+        logger.debug("Watermark checkpointed", source=source, event_timestamp=watermark.timestamp)
+    
+    def close(self):
+        self.conn.close()
+
+class PublishedEventCache:
+    """Bounded LRU set of recently published event ids"""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._ids = OrderedDict()
+    
+    def __contains__(self, event_id: str) -> bool:
+        if event_id in self._ids:
+            self._ids.move_to_end(event_id)
+            return True
+        return False
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add_many(self, event_ids: Iterable[str]):
+        for event_id in event_ids:
+            self._ids[event_id] = None
+            self._ids.move_to_end(event_id)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
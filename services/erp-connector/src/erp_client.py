@@ -1,6 +1,8 @@
 import aiohttp
 import json
+from typing import AsyncIterator, Dict, List, Optional
 from config import settings
+from checkpoint import Watermark
 from structlog import get_logger
 
 logger = get_logger()
@@ -9,12 +11,59 @@ class ERPClient:
     def __init__(self):
         self.base_url = settings.ERP_BASE_URL
         self.auth_token = settings.ERP_AUTH_TOKEN
+        self.page_size = settings.ERP_PAGE_SIZE
+        self.max_pages = settings.ERP_MAX_PAGES_PER_POLL
+        self.session: Optional[aiohttp.ClientSession] = None
     
-    async def get_recent_events(self):
-        """Fetch recent events from ERP system"""
-        # This is a simulation - replace with actual ERP API integration
-        # For JD Edwards, this might use BSSV APIs or direct database queries
+    async def start(self):
+        """Open the shared HTTP session; connections are kept alive across polls"""
+        connector = aiohttp.TCPConnector(
+            limit=settings.ERP_MAX_CONNECTIONS,
+            limit_per_host=settings.ERP_MAX_CONNECTIONS_PER_HOST,
+            ttl_dns_cache=settings.ERP_DNS_CACHE_TTL_SECONDS,
+            keepalive_timeout=settings.ERP_KEEPALIVE_TIMEOUT_SECONDS,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.ERP_REQUEST_TIMEOUT_SECONDS),
+            headers={"Authorization": f"Bearer {self.auth_token}"} if self.auth_token else None,
+            raise_for_status=True
+        )
+    
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def get_recent_events(self, since: Optional[Watermark] = None) -> AsyncIterator[List[Dict]]:
+        """Stream up to max_pages pages of events newer than the given watermark from ERP system"""
+        if settings.ERP_SIMULATION_MODE:
+            yield self._simulated_events(since)
+            return
+        
+        params = {"limit": str(self.page_size)}
+        if since is not None:
+            params.update(since_timestamp=since.timestamp, since_id=since.event_id)
         
+        # For JD Edwards this is a BSSV/REST facade over the change tables. It filters on
+        # (timestamp, id) > since, orders the same way and returns {"events": [...], "next_cursor": ...}
+        for _ in range(self.max_pages):
+            async with self.session.get(f"{self.base_url}/events", params=params) as response:
+                page = await response.json()
+            
+            events = page.get("events", [])
+            if events:
+                logger.debug("ERP events page fetched", count=len(events))
+                yield events
+            
+            cursor = page.get("next_cursor")
+            if not cursor or not events:
+                return
+            params["cursor"] = cursor
+    
+    def _simulated_events(self, since: Optional[Watermark]) -> List[Dict]:
+        """Canned events for local development (ERP_SIMULATION_MODE)"""
         simulated_events = [
             {
                 "id": "event_001",
@@ -45,6 +94,12 @@ class ERPClient:
             }
         ]
         
+        if since is not None:
+            simulated_events = [
+                event for event in simulated_events
+                if (event["timestamp"], event["id"]) > (since.timestamp, since.event_id)
+            ]
+        
         logger.info("Simulated ERP events fetched", count=len(simulated_events))
         return simulated_events
     
\ No newline at end of file
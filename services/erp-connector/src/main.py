@@ -1,19 +1,48 @@
 import asyncio
 import logging
 import json
-from typing import Dict, Any
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from aiokafka import AIOKafkaProducer
 
+def json_serializer(value: dict) -> bytes:
+    return json.dumps(value).encode('utf-8')
+
+class SerializationError(Exception):
+    """An event could not be turned into a Kafka record; it is rejected on its own, not with its page"""
+
 class KafkaProducer:
-    def __init__(self):
-        self.producer = AIOKafkaProducer(bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS)
+    def __init__(self, producer=None, value_serializer: Optional[Callable[[dict], bytes]] = None):
+        # Long-lived producer: connections and metadata are reused across poll cycles
+        self.producer = producer or AIOKafkaProducer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            linger_ms=settings.KAFKA_LINGER_MS,
+            max_batch_size=settings.KAFKA_MAX_BATCH_SIZE,
+            compression_type=settings.KAFKA_COMPRESSION_TYPE,
+        )
+        self.value_serializer = value_serializer or json_serializer
     
-    async def publish(self, topic: str, key: str, value: dict):
+    async def start(self):
         await self.producer.start()
+    
+    async def stop(self):
+        """Flush pending batches and close broker connections"""
         try:
-            await self.producer.send_and_wait(topic, key=key.encode('utf-8'), value=json.dumps(value).encode('utf-8'))
+            await self.producer.flush()
         finally:
             await self.producer.stop()
+    
+    async def send(self, topic: str, key: str, value: dict):
+        """Append a record to the producer batch; returns a future resolved on broker ack"""
+        try:
+            key_bytes, value_bytes = key.encode('utf-8'), self.value_serializer(value)
+        except Exception as e:
+            raise SerializationError(f"{type(e).__name__}: {e}") from e
+        return await self.send_bytes(topic, key_bytes, value_bytes)
+    
+    async def send_bytes(self, topic: str, key: bytes, value: bytes):
+        return await self.producer.send(topic, key=key, value=value)
 try:
     try:
         from erp_client import ERPClient  # Adjusted import path
@@ -21,6 +50,9 @@ try:
         raise ImportError("The module 'erp_client' could not be found. Ensure it exists and is in the correct path.")
 except ImportError:
     raise ImportError("The module 'erp_client' could not be found. Ensure it exists and is in the Python path.")
+from avro_serde import ERPEventSerializer
+from checkpoint import PublishedEventCache, Watermark, WatermarkStore
+from scheduler import AdaptivePollScheduler
 try:
     from config import settings
 except ImportError:
@@ -33,13 +65,109 @@ logger = get_logger()
 # Metrics
 events_processed = prom.Counter('erp_connector_events_processed', 'Number of ERP events processed', ['event_type'])
 processing_errors = prom.Counter('erp_connector_processing_errors', 'Number of processing errors')
+rejected_events = prom.Counter('erp_connector_rejected_events',
+                               'ERP events that could not be serialized and went to the dead-letter topic')
+duplicate_events = prom.Counter('erp_connector_duplicate_events',
+                                'ERP events skipped because they were already published')
+publish_lanes = prom.Gauge('erp_connector_publish_lanes', 'Number of ordered publishing lanes')
+publish_queue_depth = prom.Gauge('erp_connector_publish_queue_depth', 'ERP events waiting to be sent to Kafka')
+poll_interval = prom.Gauge('erp_connector_poll_interval_seconds', 'Delay before the next ERP poll')
+
+class LanePublisher:
+    """Publish a poll cycle over ordered lanes with a bounded number of unacked records.
+
+    Events are routed to a lane by entity_id, so events for the same entity are
+    always sent in the order they were fetched.
+    """
+    def __init__(self, kafka_producer: KafkaProducer, lanes: int, max_in_flight: int):
+        self.kafka_producer = kafka_producer
+        self.lanes = lanes
+        self.max_in_flight = max_in_flight
+        publish_lanes.set(lanes)
+    
+    def _lane_for(self, key: str) -> int:
+        return zlib.crc32(str(key).encode('utf-8')) % self.lanes
+    
+    async def publish(self, topic: str, events: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str]]:
+        """Send all events and wait until every one has been acked by the broker.
+
+        Events that cannot be serialized are skipped and returned as
+        (event, error) pairs; broker failures still fail the whole call.
+        """
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        lanes = [[] for _ in range(self.lanes)]
+        for event in events:
+            lanes[self._lane_for(event.get("entity_id"))].append(event)
+        publish_queue_depth.inc(len(events))
+        
+        acks, rejected = [], []
+        try:
+            await asyncio.gather(*(
+                self._drain_lane(topic, lane, in_flight, acks, rejected) for lane in lanes if lane
+            ))
+        finally:
+            results = await asyncio.gather(*acks, return_exceptions=True)
+            publish_queue_depth.set(0)
+        
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+        return rejected
+    
+    async def _drain_lane(self, topic: str, lane: List[Dict[str, Any]], in_flight: asyncio.Semaphore,
+                          acks: list, rejected: list):
+        # Records are appended to the producer in lane order; only the acks are awaited concurrently
+        for event in lane:
+            await in_flight.acquire()
+            try:
+                ack = await self.kafka_producer.send(topic, event["entity_id"], event)
+            except SerializationError as e:
+                in_flight.release()
+                publish_queue_depth.dec()
+                rejected.append((event, str(e)))
+                continue
+            except Exception:
+                in_flight.release()
+                raise
+            publish_queue_depth.dec()
+            acks.append(asyncio.ensure_future(self._await_ack(ack, event, in_flight)))
+    
+    async def _await_ack(self, ack, event: Dict[str, Any], in_flight: asyncio.Semaphore):
+        try:
+            await ack
+            events_processed.labels(event_type=event["event_type"]).inc()
+        finally:
+            in_flight.release()
 
 class ERPConnector:
+    SOURCE = "jde_erp"
+    
     def __init__(self):
         self.erp_client = ERPClient()
-        self.kafka_producer = KafkaProducer()
+        self.kafka_producer = KafkaProducer(value_serializer=self._value_serializer())
+        self.publisher = LanePublisher(
+            self.kafka_producer,
+            lanes=settings.PUBLISH_LANES,
+            max_in_flight=settings.PUBLISH_MAX_IN_FLIGHT
+        )
+        self.watermarks = WatermarkStore(settings.CHECKPOINT_DB_PATH)
+        self.watermark = self.watermarks.load(self.SOURCE)
+        self.published_ids = PublishedEventCache(settings.DEDUP_CACHE_SIZE)
+        self.scheduler = AdaptivePollScheduler(
+            base_interval=settings.POLL_INTERVAL_SECONDS,
+            min_interval=settings.POLL_MIN_INTERVAL_SECONDS,
+            max_interval=settings.POLL_MAX_INTERVAL_SECONDS,
+            backoff_factor=settings.POLL_BACKOFF_FACTOR,
+            jitter=settings.POLL_JITTER
+        )
         self.is_running = False
     
+    @staticmethod
+    def _value_serializer() -> Callable[[dict], bytes]:
+        if settings.KAFKA_SERIALIZATION == "avro":
+            return ERPEventSerializer(settings.ERP_EVENT_SCHEMA_PATH, settings.ERP_EVENT_SCHEMA_ID)
+        return json_serializer
+    
     async def start(self):
         """Start the ERP connector service"""
         self.is_running = True
@@ -48,39 +176,94 @@ class ERPConnector:
         # Start metrics server
         prom.start_http_server(8000)
         
-        while self.is_running:
-            try:
-                await self._poll_erp_events()
-                await asyncio.sleep(settings.POLL_INTERVAL_SECONDS)
-            except Exception as e:
-                logger.error("Error in ERP polling cycle", error=str(e))
-                processing_errors.inc()
-                await asyncio.sleep(10)  # Backoff on error
-    
-    async def _poll_erp_events(self):
-        """Poll ERP system for new events"""
+        await self.kafka_producer.start()
+        await self.erp_client.start()
+        try:
+            while self.is_running:
+                try:
+                    fetched, backlog = await self._poll_erp_events()
+                    delay = self.scheduler.record_poll(fetched, backlog)
+                except Exception as e:
+                    logger.error("Error in ERP polling cycle", error=str(e))
+                    processing_errors.inc()
+                    delay = self.scheduler.record_failure()
+                poll_interval.set(delay)
+                await asyncio.sleep(delay)
+        finally:
+            await self.erp_client.close()
+            await self.kafka_producer.stop()
+            self.watermarks.close()
+    
+    async def stop(self):
+        """Stop polling; the producer is flushed and closed once the current cycle ends"""
+        self.is_running = False
+    
+    async def _poll_erp_events(self) -> Tuple[int, bool]:
+        """Poll ERP system for new events; returns (events fetched, whether the ERP has more waiting)"""
         try:
-            # Simulate fetching events from ERP (replace with actual ERP API calls)
-            events = await self.erp_client.get_recent_events()
+            fetched = published = 0
+            backlog = False
+            # Pages are published and checkpointed one at a time so large backfills stay flat in memory
+            async for events in self.erp_client.get_recent_events(since=self.watermark):
+                fetched += len(events)
+                # A full last page means the poll stopped at ERP_MAX_PAGES_PER_POLL with more to read
+                backlog = len(events) >= self.erp_client.page_size
+                published += await self._publish_page(events)
             
-            for event in events:
-                # Transform ERP event to standard format
-                kafka_event = self._transform_event(event)
-                
-                # Publish to Kafka
-                await self.kafka_producer.publish(
-                    topic="erp-events",
-                    key=event["entity_id"],
-                    value=kafka_event
-                )
-                
-                events_processed.labels(event_type=event["event_type"]).inc()
-                logger.info("ERP event published to Kafka", event_type=event["event_type"], entity_id=event["entity_id"])
+            if published:
+                logger.info("ERP events published to Kafka", count=published)
+            return fetched, backlog
                 
         except Exception as e:
             logger.error("Failed to poll ERP events", error=str(e))
             raise
     
+    async def _publish_page(self, events: List[Dict[str, Any]]) -> int:
+        # Drop events already published by an earlier cycle (e.g. a timestamp collision at the watermark)
+        new_events = [event for event in events if event.get("id") not in self.published_ids]
+        duplicate_events.inc(len(events) - len(new_events))
+        if not new_events:
+            return 0
+        
+        # Transform ERP events to standard format
+        kafka_events = [self._transform_event(event) for event in new_events]
+        
+        # Publish the page to Kafka through the ordered lanes
+        rejected = await self.publisher.publish(topic="erp-events", events=kafka_events)
+        if rejected:
+            await self._dead_letter(rejected)
+        
+        # Checkpoint only after every event of the page has been acked or dead-lettered
+        self.published_ids.add_many(event["event_id"] for event in kafka_events if event["event_id"] is not None)
+        self._advance_watermark(kafka_events)
+        return len(kafka_events) - len(rejected)
+    
+    async def _dead_letter(self, rejected: List[Tuple[Dict[str, Any], str]]):
+        """Park events the schema cannot encode so the page, and the watermark, can move past them"""
+        acks = []
+        for event, error in rejected:
+            logger.error("ERP event rejected", event_id=event.get("event_id"), event_type=event.get("event_type"),
+                         error=error)
+            record = json.dumps({"event": event, "error": error}, default=str).encode('utf-8')
+            acks.append(await self.kafka_producer.send_bytes(
+                settings.DEAD_LETTER_TOPIC, str(event.get("entity_id") or "").encode('utf-8'), record
+            ))
+        await asyncio.gather(*acks)
+        rejected_events.inc(len(rejected))
+    
+    def _advance_watermark(self, kafka_events: List[Dict[str, Any]]):
+        # Events without a usable (timestamp, id) cannot be ordered, so they never move the watermark
+        positions = [
+            Watermark(event["timestamp"], event["event_id"]) for event in kafka_events
+            if isinstance(event["event_id"], str) and _is_timestamp(event["timestamp"])
+        ]
+        if not positions:
+            return
+        latest = max(positions)
+        if self.watermark is None or latest > self.watermark:
+            self.watermark = latest
+            self.watermarks.save(self.SOURCE, latest)
+    
     def _transform_event(self, erp_event: Dict[str, Any]) -> Dict[str, Any]:
         """Transform ERP-specific event to standard Aurora event format"""
         return {
@@ -89,10 +272,17 @@ class ERPConnector:
             "entity_id": erp_event.get("entity_id"),
             "timestamp": erp_event.get("timestamp"),
             "payload": erp_event.get("data", {}),
-            "source_system": "jde_erp",
+            "source_system": self.SOURCE,
             "version": "1.0"
         }
 
+def _is_timestamp(value) -> bool:
+    try:
+        datetime.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
 async def main():
     connector = ERPConnector()
     await connector.start()
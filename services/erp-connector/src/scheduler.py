@@ -0,0 +1,39 @@
+import random
+
+class AdaptivePollScheduler:
+    """Chooses the delay before the next ERP poll from the outcome of the last one.
+
+    A full page means the connector is behind, so the next poll comes after
+    min_interval. Empty polls and failures back off exponentially, with jitter,
+    up to max_interval; any events bring it back to the base interval.
+    """
+    def __init__(self, base_interval: float, min_interval: float, max_interval: float,
+                 backoff_factor: float = 2.0, jitter: float = 0.2):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = self._clamp(base_interval)
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.interval = self.base_interval
+    
+    def record_poll(self, fetched: int, backlog: bool) -> float:
+        """Return the delay after a successful poll that fetched `fetched` events"""
+        if backlog:
+            self.interval = self.min_interval
+        elif fetched:
+            self.interval = self.base_interval
+        else:
+            self.interval = self._clamp(self.interval * self.backoff_factor)
+        return self._next_delay()
+    
+    def record_failure(self) -> float:
+        """Return the delay after a failed poll"""
+        self.interval = self._clamp(max(self.interval, self.base_interval) * self.backoff_factor)
+        return self._next_delay()
+    
+    def _next_delay(self) -> float:
+        # Jitter downwards so that replicas recovering from the same outage spread out
+        return self._clamp(self.interval * (1 - self.jitter * random.random()))
+    
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
@@ -0,0 +1,184 @@
+"""Rolling-origin backtest of demand-forecaster candidates.
+
+For every model and training window, folds step forward through time: train
+on the window ending at each origin, then score the next --horizon-days.
+The feature matrix is built once, saved as .npy next to the run, and
+memory-mapped by every worker, so folds share it instead of copying it.
+(model, window, fold) tasks run in parallel across processes.
+
+Reports per-fold MAE/RMSE/R², fit time and single-row predict latency (the
+online path scores one entity at a time), then a summary per (model, window),
+total wall-clock and peak RSS.
+
+    python scripts/backtest.py --n-products 200 --workers 4
+    python scripts/backtest.py --dataset data/inventory_training --windows 0 90 180 --models random_forest
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from train_inventory_model import FEATURE_COLUMNS, generate_training_data  # noqa: E402
+from training_dataset import load_dataset  # noqa: E402
+
+# Candidates mirror train_inventory_model.build_model. Folds run side by side, one per worker process:
+# forests get n_jobs=1 and _init_worker caps OpenMP/BLAS (used by HistGradientBoosting) at one thread
+MODELS = {
+    'random_forest': lambda: RandomForestRegressor(n_estimators=100, max_depth=10, n_jobs=1, random_state=42),
+    'random_forest_small': lambda: RandomForestRegressor(n_estimators=30, max_depth=8, n_jobs=1, random_state=42),
+    'hist_gradient_boosting': lambda: HistGradientBoostingRegressor(max_iter=200, max_depth=10,
+                                                                    early_stopping=False, random_state=42),
+}
+
+LATENCY_SAMPLES = 200
+
+_matrix = {}  # Per-worker memory-mapped arrays, opened once by _init_worker
+
+
+def build_matrix(df: pd.DataFrame, cache_dir: str) -> str:
+    """Save features, target and day index as .npy files ordered by date"""
+    day = (df['date'] - df['date'].min()).dt.days.to_numpy(np.int32)
+    order = np.argsort(day, kind='stable')
+    np.save(os.path.join(cache_dir, 'X.npy'), df[FEATURE_COLUMNS].to_numpy(np.float64)[order])
+    np.save(os.path.join(cache_dir, 'y.npy'), df['demand'].to_numpy(np.float64)[order])
+    np.save(os.path.join(cache_dir, 'day.npy'), day[order])
+    return cache_dir
+
+
+def _init_worker(cache_dir: str):
+    # One thread per worker, otherwise every process starts an OpenMP pool as wide as the machine
+    threadpool_limits(limits=1)
+    for name in ('X', 'y', 'day'):
+        _matrix[name] = np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+
+
+def make_folds(n_days: int, initial_days: int, horizon_days: int, step_days: int):
+    """(train_end, test_end) day offsets; test covers [train_end, test_end)"""
+    folds = []
+    train_end = initial_days
+    while train_end + horizon_days <= n_days:
+        folds.append((train_end, train_end + horizon_days))
+        train_end += step_days
+    return folds
+
+
+def run_fold(model_name: str, window_days: int, fold_index: int, train_end: int, test_end: int) -> dict:
+    X, y, day = _matrix['X'], _matrix['y'], _matrix['day']
+    # Rows are sorted by day, so every window is a contiguous (zero-copy) slice
+    train_start = 0 if window_days == 0 else max(0, train_end - window_days)
+    lo, mid, hi = np.searchsorted(day, [train_start, train_end, test_end])
+
+    model = MODELS[model_name]()
+    started = time.perf_counter()
+    model.fit(X[lo:mid], y[lo:mid])
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    predictions = model.predict(X[mid:hi])
+    batch_seconds = time.perf_counter() - started
+
+    latencies = []
+    for row in X[mid:mid + LATENCY_SAMPLES]:
+        started = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - started)
+
+    return {
+        'model': model_name,
+        'window_days': window_days,
+        'fold': fold_index,
+        'train_end_day': train_end,
+        'train_rows': int(mid - lo),
+        'test_rows': int(hi - mid),
+        'mae': mean_absolute_error(y[mid:hi], predictions),
+        'rmse': float(np.sqrt(mean_squared_error(y[mid:hi], predictions))),
+        'r2': r2_score(y[mid:hi], predictions),
+        'fit_seconds': fit_seconds,
+        'batch_predict_us_per_row': batch_seconds / max(1, hi - mid) * 1e6,
+        'single_row_p50_ms': float(np.median(latencies)) * 1e3,
+        'worker_peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", help="Read from a materialized Parquet dataset instead of generating data")
+    parser.add_argument("--n-products", type=int, default=50)
+    parser.add_argument("--start-date", default="2023-01-01")
+    parser.add_argument("--end-date", default="2024-01-15")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=sorted(MODELS))
+    parser.add_argument("--windows", nargs="+", type=int, default=[0, 90],
+                        help="Training window lengths in days; 0 means expanding")
+    parser.add_argument("--initial-days", type=int, default=180)
+    parser.add_argument("--horizon-days", type=int, default=14)
+    parser.add_argument("--step-days", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Write per-fold results to this CSV")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+
+    if args.dataset:
+        df = load_dataset(FEATURE_COLUMNS + ['date', 'demand'], args.start_date, args.end_date, path=args.dataset)
+    else:
+        df = generate_training_data(n_products=args.n_products, start_date=args.start_date, end_date=args.end_date)
+    n_days = int((df['date'].max() - df['date'].min()).days) + 1
+    folds = make_folds(n_days, args.initial_days, args.horizon_days, args.step_days)
+    if not folds:
+        raise SystemExit(f"{n_days} days of data is too short for --initial-days {args.initial_days} "
+                         f"+ --horizon-days {args.horizon_days}")
+
+    with tempfile.TemporaryDirectory(prefix="backtest-") as cache_dir:
+        build_matrix(df, cache_dir)
+        rows = len(df)
+        del df
+
+        tasks = [(model, window, index, train_end, test_end)
+                 for model in args.models
+                 for window in args.windows
+                 for index, (train_end, test_end) in enumerate(folds)]
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                 initargs=(cache_dir,)) as pool:
+            results = list(pool.map(run_fold, *zip(*tasks)))
+
+    wall_clock = time.perf_counter() - started
+    folds_df = pd.DataFrame(results)
+    pd.set_option('display.width', 200)
+    print(folds_df.drop(columns=['worker_peak_rss_mb']).round(4).to_string(index=False))
+
+    summary = folds_df.groupby(['model', 'window_days']).agg(
+        folds=('fold', 'count'),
+        mae=('mae', 'mean'),
+        rmse=('rmse', 'mean'),
+        r2=('r2', 'mean'),
+        fit_seconds=('fit_seconds', 'mean'),
+        single_row_p50_ms=('single_row_p50_ms', 'median'),
+    )
+    print()
+    print(summary.round(4).to_string())
+
+    peak_rss_mb = max(folds_df['worker_peak_rss_mb'].max(),
+                      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+    print(f"\n{len(tasks)} fits over {rows} rows, {len(folds)} folds, {args.workers} workers: "
+          f"{wall_clock:.1f}s wall-clock, peak RSS {peak_rss_mb:.0f} MB (largest single process)")
+
+    if args.output:
+        folds_df.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
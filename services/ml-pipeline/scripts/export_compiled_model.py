@@ -0,0 +1,138 @@
+"""Export a trained RandomForestRegressor as flat NumPy arrays for CompiledForest.
+
+The arrays are written to a temporary file and only moved over --output once
+prediction parity against sklearn has been checked, so a serving process
+never picks up a bad or half-written model. Reports latency, throughput and
+size of both representations.
+
+    python scripts/export_compiled_model.py --model models/inventory_model.joblib \
+        --output models/inventory_model_compiled.npz
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import joblib
+import numpy as np
+
+PREDICTION_SERVICE_SRC = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "prediction-service", "src"
+)
+sys.path.insert(0, PREDICTION_SERVICE_SRC)
+
+from compiled_forest import CompiledForest  # noqa: E402
+
+
+def flatten_forest(model) -> dict:
+    """Concatenate every tree's nodes into contiguous arrays with global child indices.
+
+    Nodes are renumbered breadth-first so that each right child directly follows
+    its left child; leaves get their own index as child and a +inf threshold.
+    """
+    features, thresholds, lefts, values, roots = [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        order = [0]
+        new_index = np.zeros(tree.node_count, dtype=np.int64)
+        for node in order:  # grows while iterating: breadth-first walk
+            if tree.children_left[node] != -1:
+                for child in (tree.children_left[node], tree.children_right[node]):
+                    new_index[child] = len(order)
+                    order.append(child)
+        order = np.asarray(order)
+        is_leaf = tree.children_left[order] == -1
+        first_child = new_index[np.maximum(tree.children_left[order], 0)]
+
+        features.append(np.where(is_leaf, 0, tree.feature[order]).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+        lefts.append((np.where(is_leaf, np.arange(tree.node_count), first_child) + offset).astype(np.int32))
+        values.append(tree.value[order, 0, 0])
+        roots.append(offset)
+        offset += tree.node_count
+
+    return {
+        "feature": np.concatenate(features),
+        "threshold": to_float32_thresholds(np.concatenate(thresholds)),
+        "left": np.concatenate(lefts),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.asarray(max(estimator.tree_.max_depth for estimator in model.estimators_)),
+        "n_features": np.asarray(model.n_features_in_),
+    }
+
+
+def to_float32_thresholds(thresholds: np.ndarray) -> np.ndarray:
+    """Round float64 split thresholds down to float32.
+
+    sklearn compares float32 inputs against float64 thresholds. No float32 lies
+    strictly between a threshold and its float32 round-down, so `x > threshold`
+    gives the same answer for every float32 x.
+    """
+    rounded = thresholds.astype(np.float32)
+    over = rounded.astype(np.float64) > thresholds
+    rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+    return rounded
+
+
+def check_parity(model, forest: CompiledForest, X: np.ndarray, tolerance: float = 1e-9):
+    expected = model.predict(X)
+    actual = forest.predict(X)
+    error = np.max(np.abs(expected - actual))
+    if error > tolerance:
+        raise ValueError(f"Compiled forest diverges from sklearn: max abs error {error:.3g}")
+    return error
+
+
+def time_per_call(predict, X, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        predict(X)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="models/inventory_model.joblib")
+    parser.add_argument("--output", default="models/inventory_model_compiled.npz")
+    parser.add_argument("--parity-rows", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    arrays = flatten_forest(model)
+    temporary = f"{args.output}.tmp.npz"  # np.savez would append .npz to any other name
+    np.savez(temporary, **arrays)
+    try:
+        forest = CompiledForest.load(temporary)
+
+        # Parity on random rows plus rows made of split thresholds, which exercise the boundaries
+        rng = np.random.default_rng(42)
+        splits = arrays["threshold"][np.isfinite(arrays["threshold"])]
+        random_rows = rng.uniform(splits.min() - 1, splits.max() + 1, size=(args.parity_rows, model.n_features_in_))
+        boundary_rows = rng.choice(splits, size=(args.parity_rows, model.n_features_in_))
+        X = np.vstack([random_rows, boundary_rows])
+        error = check_parity(model, forest, X)
+    except Exception:
+        os.remove(temporary)
+        raise
+    os.replace(temporary, args.output)  # Atomic: readers see the old file or the new one
+    print(f"parity   {len(X)} rows, max abs error {error:.3g}")
+
+    sklearn_bytes = len(pickle.dumps(model))
+    compiled_bytes = sum(array.nbytes for array in arrays.values())
+    print(f"size     sklearn {sklearn_bytes / 1e6:.2f} MB  compiled {compiled_bytes / 1e6:.2f} MB")
+
+    single, batch = X[:1], X[:args.batch_size]
+    for label, predict in (("sklearn", model.predict), ("compiled", forest.predict)):
+        single_latency = time_per_call(predict, single, repeat=200)
+        batch_latency = time_per_call(predict, batch, repeat=20)
+        print(f"{label:<8} single-row {single_latency * 1e3:7.3f} ms  "
+              f"batch {args.batch_size / batch_latency:>10.0f} rows/sec")
+    print(f"Compiled model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,123 @@
+import argparse
+import os
 import mlflow
+import mlflow.sklearn
+import pandas as pd
 from mlflow.tracking import MlflowClient
+from sklearn.metrics import r2_score
+from train_inventory_model import FEATURE_COLUMNS, generate_training_data
 
-def register_best_model():
-    """Register the best model from MLflow experiments"""
-    client = MlflowClient()
-    
-    # Find the best run (highest test R² score)
-    experiment = client.get_experiment_by_name("inventory-forecasting")
+EXPERIMENT_NAME = "inventory-forecasting"
+MODEL_NAME = "inventory-demand-forecaster"
+MODEL_ARTIFACT = "inventory-forecast-model"
+
+HOLDOUT_DIR = os.getenv("HOLDOUT_DIR", "data/holdout")  # One cached Parquet file per holdout window
+HOLDOUT_DAYS = int(os.getenv("HOLDOUT_DAYS", "30"))  # Days scored after the newest training data compared
+DEFAULT_DATA_END_DATE = "2024-01-15"  # train_model's default, for runs that did not log data_end_date
+
+def find_best_run(client, min_test_r2=0.0):
+    """Best finished run by test R², fetched as a single result instead of listing every run"""
+    experiment = client.get_experiment_by_name(EXPERIMENT_NAME)
+    if experiment is None:
+        return None
     runs = client.search_runs(
         experiment_ids=[experiment.experiment_id],
-        order_by=["metrics.test_r2 DESC"]
+        filter_string=f"attributes.status = 'FINISHED' and metrics.test_r2 >= {min_test_r2}",
+        order_by=["metrics.test_r2 DESC"],
+        max_results=1
     )
+    return runs[0] if runs else None
+
+def data_end_date(client, run_id):
+    """Last day of data a run was trained on, as logged by train_model"""
+    params = client.get_run(run_id).data.params
+    return pd.Timestamp(params.get("data_end_date", DEFAULT_DATA_END_DATE))
+
+def holdout_window(trained_through, days=HOLDOUT_DAYS):
+    """The days right after trained_through, so no compared model has seen them"""
+    start = trained_through + pd.Timedelta(days=1)
+    return start.strftime('%Y-%m-%d'), (start + pd.Timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+def load_holdout(start_date, end_date, holdout_dir=HOLDOUT_DIR):
+    """Holdout set for [start_date, end_date], generated once per window and reused by later checks"""
+    path = os.path.join(holdout_dir, f"holdout_{start_date}_{end_date}.parquet")
+    if not os.path.exists(path):
+        df = generate_training_data(start_date=start_date, end_date=end_date, seed=7)
+        os.makedirs(holdout_dir, exist_ok=True)
+        df[FEATURE_COLUMNS + ['demand']].to_parquet(path, index=False)
+    df = pd.read_parquet(path, columns=FEATURE_COLUMNS + ['demand'])
+    return df[FEATURE_COLUMNS], df['demand']
+
+def holdout_r2(model_uri, X, y):
+    model = mlflow.sklearn.load_model(model_uri)
+    return r2_score(y, model.predict(X))
+
+def register_best_model(min_test_r2=0.0, min_improvement=0.0, holdout_dir=HOLDOUT_DIR, holdout_days=HOLDOUT_DAYS):
+    """Register the best model from MLflow experiments and promote it if it beats Production.
+
+    The candidate is compared with the current Production version on the
+    holdout_days after the later of their logged data_end_date, so neither
+    was trained on them; it is only registered and transitioned when its
+    holdout R² is at least min_improvement higher.
+    """
+    client = MlflowClient()
     
-    if runs:
-        best_run = runs[0]
-        model_uri = f"runs:/{best_run.info.run_id}/inventory-forecast-model"
-        
-        # Register model
-        registered_model = mlflow.register_model(
-            model_uri=model_uri,
-            name="inventory-demand-forecaster"
-        )
-        
-        print(f"Registered model: {registered_model.name} version {registered_model.version}")
-        
-        # Transition to Production
-        client.transition_model_version_stage(
-            name="inventory-demand-forecaster",
-            version=registered_model.version,
-            stage="Production"
-        )
-        
-        return registered_model
-    else:
+    best_run = find_best_run(client, min_test_r2)
+    if best_run is None:
         print("No runs found!")
         return None
+    
+    candidate_uri = f"runs:/{best_run.info.run_id}/{MODEL_ARTIFACT}"
+    production = client.get_latest_versions(MODEL_NAME, stages=["Production"])
+    if production and production[0].run_id == best_run.info.run_id:
+        print(f"Run {best_run.info.run_id} is already Production (version {production[0].version})")
+        return production[0]
+    
+    trained_through = data_end_date(client, best_run.info.run_id)
+    if production:
+        trained_through = max(trained_through, data_end_date(client, production[0].run_id))
+    start_date, end_date = holdout_window(trained_through, holdout_days)
+    print(f"Holdout: {start_date} to {end_date}")
+    X, y = load_holdout(start_date, end_date, holdout_dir)
+    candidate_r2 = holdout_r2(candidate_uri, X, y)
+    client.log_metric(best_run.info.run_id, "holdout_r2", candidate_r2)
+    print(f"Candidate run {best_run.info.run_id}: holdout R² {candidate_r2:.4f}")
+    
+    if production:
+        production_r2 = holdout_r2(f"models:/{MODEL_NAME}/{production[0].version}", X, y)
+        print(f"Production version {production[0].version}: holdout R² {production_r2:.4f}")
+        if candidate_r2 < production_r2 + min_improvement:
+            print("Candidate does not beat Production; not promoting")
+            return None
+    
+    # Register model
+    registered_model = mlflow.register_model(
+        model_uri=candidate_uri,
+        name=MODEL_NAME
+    )
+    
+    print(f"Registered model: {registered_model.name} version {registered_model.version}")
+    
+    # Transition to Production
+    client.transition_model_version_stage(
+        name=MODEL_NAME,
+        version=registered_model.version,
+        stage="Production",
+        archive_existing_versions=True
+    )
+    
+    return registered_model
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Register and promote the best inventory-forecasting run")
+    parser.add_argument("--min-test-r2", type=float, default=0.0, help="Ignore runs below this test R²")
+    parser.add_argument("--min-improvement", type=float, default=0.0,
+                        help="Holdout R² the candidate must gain over Production")
+    parser.add_argument("--holdout-dir", default=HOLDOUT_DIR)
+    parser.add_argument("--holdout-days", type=int, default=HOLDOUT_DAYS,
+                        help="Days after the newest training data to score on")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    register_best_model()
+    args = parse_args()
+    register_best_model(args.min_test_r2, args.min_improvement, args.holdout_dir, args.holdout_days)
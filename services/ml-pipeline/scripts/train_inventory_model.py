@@ -1,60 +1,146 @@
+import argparse
+import json
+import resource
+import time
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
 from sklearn.model_selection import train_test_split
 import mlflow
 import mlflow.sklearn
 import joblib
 from datetime import datetime
+from training_dataset import DATASET_PATH, load_dataset, write_dataset
 
-def generate_training_data():
-    """Generate simulated inventory training data"""
-    np.random.seed(42)
+TREND_ORIGIN = pd.Timestamp('2023-01-01')
+
+def generate_training_data(n_products=50, start_date='2023-01-01', end_date='2024-01-15', seed=42):
+    """Generate simulated inventory training data, one row per (date, product).
+
+    Rows are built array-wise over the whole date x product grid, so large
+    load-testing datasets (millions of rows) take seconds. The same seed gives
+    the same frame.
+    """
+    rng = np.random.default_rng(seed)
     
-    dates = pd.date_range(start='2023-01-01', end='2024-01-15', freq='D')
-    products = [f'PROD-{i:03d}' for i in range(1, 51)]  # 50 products
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    products = [f'PROD-{i:03d}' for i in range(1, n_products + 1)]
+    n_rows = len(dates) * n_products
     
-    data = []
-    for date in dates:
-        for product in products:
-            # Simulate sales patterns (seasonality + trend + noise)
-            base_demand = 10 + 5 * np.sin(2 * np.pi * date.dayofyear / 365)
-            trend = 0.01 * (date - dates[0]).days
-            noise = np.random.normal(0, 2)
-            
-            demand = max(0, int(base_demand + trend + noise))
-            
-            data.append({
-                'date': date,
-                'product_id': product,
-                'day_of_week': date.dayofweek,
-                'day_of_year': date.dayofyear,
-                'month': date.month,
-                'historical_demand_7d': demand + np.random.normal(0, 1),
-                'historical_demand_30d': demand * 4 + np.random.normal(0, 2),
-                'price': np.random.uniform(10, 100),
-                'is_weekend': 1 if date.dayofweek >= 5 else 0,
-                'demand': demand
-            })
+    # Date-major grid: every product for the first date, then the next date, ...
+    date_index = np.repeat(np.arange(len(dates)), n_products)
+    day_of_week = dates.dayofweek.to_numpy()[date_index]
+    day_of_year = dates.dayofyear.to_numpy()[date_index]
     
-    return pd.DataFrame(data)
+    # Simulate sales patterns (seasonality + trend + noise)
+    base_demand = 10 + 5 * np.sin(2 * np.pi * day_of_year / 365)
+    # Anchored to a fixed origin so separately generated date windows line up
+    trend = 0.01 * (dates - TREND_ORIGIN).days.to_numpy()[date_index]
+    noise = rng.normal(0, 2, n_rows)
+    demand = np.maximum(0, np.trunc(base_demand + trend + noise)).astype(np.int64)
+    
+    return pd.DataFrame({
+        'date': dates[date_index],
+        'product_id': pd.Categorical.from_codes(np.tile(np.arange(n_products), len(dates)), categories=products),
+        'day_of_week': day_of_week,
+        'day_of_year': day_of_year,
+        'month': dates.month.to_numpy()[date_index],
+        'historical_demand_7d': demand + rng.normal(0, 1, n_rows),
+        'historical_demand_30d': demand * 4 + rng.normal(0, 2, n_rows),
+        'price': rng.uniform(10, 100, n_rows),
+        'is_weekend': (day_of_week >= 5).astype(np.int64),
+        'demand': demand
+    })
+
+def materialize_training_dataset(path=DATASET_PATH, n_products=50, start_date='2023-01-01', end_date='2024-01-15'):
+    """Write the simulated history as month-partitioned Parquet, one month in memory at a time"""
+    months = pd.period_range(start=start_date, end=end_date, freq='M')
+    
+    def frames():
+        for index, month in enumerate(months):
+            month_start = max(pd.Timestamp(start_date), month.start_time)
+            month_end = min(pd.Timestamp(end_date), month.end_time.normalize())
+            yield generate_training_data(n_products=n_products, start_date=month_start, end_date=month_end,
+                                         seed=42 + index)
+    
+    rows = write_dataset(frames(), path)
+    print(f"Wrote {rows} rows ({len(months)} months) to {path}")
+    return rows
+
+FEATURE_COLUMNS = ['day_of_week', 'day_of_year', 'month',
+                   'historical_demand_7d', 'historical_demand_30d',
+                   'price', 'is_weekend']
 
-def train_model():
-    """Train the inventory demand forecasting model"""
+MODEL_PATH = 'models/inventory_model.joblib'
+MODEL_STATE_PATH = 'models/inventory_model.json'  # Last date the saved model was trained through
+
+def build_model(backend, n_jobs):
+    if backend == 'random_forest':
+        return RandomForestRegressor(
+            n_estimators=100,
+            max_depth=10,
+            n_jobs=n_jobs,
+            random_state=42
+        )
+    if backend == 'hist_gradient_boosting':
+        # Uses all cores through OpenMP; n_jobs does not apply
+        return HistGradientBoostingRegressor(
+            max_iter=200,
+            max_depth=10,
+            early_stopping=False,
+            random_state=42
+        )
+    raise ValueError(f"Unknown backend: {backend}")
+
+def load_incremental_base(new_trees, n_jobs):
+    """Previous random forest set up to add new_trees trees fitted on new data only"""
+    model = joblib.load(MODEL_PATH)
+    with open(MODEL_STATE_PATH) as f:
+        state = json.load(f)
+    
+    if not isinstance(model, RandomForestRegressor):
+        # Boosting iterations correct the residuals of the earlier ones, so fitting them on the new days
+        # alone keeps the old bins and drifts the whole ensemble towards that slice
+        raise ValueError(f"Incremental training needs a random_forest model, found {type(model).__name__}; "
+                         f"retrain it in full")
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + new_trees, n_jobs=n_jobs)
+    return model, state
+
+def train_model(backend='random_forest', n_jobs=-1, incremental=False, new_trees=20,
+                n_products=50, start_date='2023-01-01', end_date='2024-01-15', dataset_path=None):
+    """Train the inventory demand forecasting model.
+
+    With incremental=True the saved random forest is extended with new_trees
+    trees fitted only on the days after the date it was last trained through;
+    hist_gradient_boosting models are always retrained in full. With dataset_path the data is
+    read from a materialized Parquet dataset instead of being generated.
+    """
+    if incremental and backend != 'random_forest':
+        raise ValueError(f"--incremental is only supported for random_forest, not {backend}")
+    if incremental:
+        model, state = load_incremental_base(new_trees, n_jobs)
+        backend = state['backend']
+        start_date = (pd.Timestamp(state['trained_through']) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        if start_date > end_date:
+            print(f"Model already trained through {state['trained_through']}; nothing to do")
+            return model
+    else:
+        model = build_model(backend, n_jobs)
+    
     # Start MLflow experiment
     mlflow.set_experiment("inventory-forecasting")
     
     with mlflow.start_run():
-        # Generate training data
-        print("Generating training data...")
-        df = generate_training_data()
+        if dataset_path:
+            # Only the model's columns and date range are read from disk
+            print(f"Loading training data from {dataset_path}, {start_date} to {end_date}...")
+            df = load_dataset(FEATURE_COLUMNS + ['demand'], start_date, end_date, path=dataset_path)
+        else:
+            print(f"Generating training data from {start_date} to {end_date}...")
+            df = generate_training_data(n_products=n_products, start_date=start_date, end_date=end_date)
         
         # Prepare features and target
-        feature_columns = ['day_of_week', 'day_of_year', 'month', 
-                          'historical_demand_7d', 'historical_demand_30d',
-                          'price', 'is_weekend']
-        
-        X = df[feature_columns]
+        X = df[FEATURE_COLUMNS]
         y = df['demand']
         
         # Split data
@@ -63,14 +149,12 @@ def train_model():
         )
         
         # Train model
-        print("Training Random Forest model...")
-        model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        )
-        
+        print(f"Training {backend} model ({'incremental' if incremental else 'full'})...")
+        started = time.perf_counter()
         model.fit(X_train, y_train)
+        train_seconds = time.perf_counter() - started
+        # ru_maxrss is in KiB on Linux
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
         
         # Evaluate model
         train_score = model.score(X_train, y_train)
@@ -78,22 +162,64 @@ def train_model():
         
         print(f"Training R² score: {train_score:.3f}")
         print(f"Test R² score: {test_score:.3f}")
+        print(f"Training time: {train_seconds:.1f}s, peak RSS: {peak_rss_mb:.0f} MB")
         
         # Log parameters and metrics
-        mlflow.log_param("n_estimators", 100)
+        mlflow.log_param("backend", backend)
+        mlflow.log_param("incremental", incremental)
+        mlflow.log_param("n_jobs", n_jobs)
         mlflow.log_param("max_depth", 10)
+        if backend == 'random_forest':
+            mlflow.log_param("n_estimators", model.n_estimators)
+        else:
+            mlflow.log_param("max_iter", model.max_iter)
+        mlflow.log_param("train_rows", len(X_train))
+        mlflow.log_param("data_source", dataset_path or "generated")
+        mlflow.log_param("data_start_date", start_date)
+        mlflow.log_param("data_end_date", end_date)
         mlflow.log_metric("train_r2", train_score)
         mlflow.log_metric("test_r2", test_score)
+        mlflow.log_metric("train_seconds", train_seconds)
+        mlflow.log_metric("peak_rss_mb", peak_rss_mb)
         
         # Log model
         mlflow.sklearn.log_model(model, "inventory-forecast-model")
         
-        # Save model locally
-        joblib.dump(model, 'models/inventory_model.joblib')
+        # Save model locally, with the date it is trained through for the next incremental run
+        joblib.dump(model, MODEL_PATH)
+        with open(MODEL_STATE_PATH, 'w') as f:
+            json.dump({'backend': backend, 'trained_through': end_date}, f)
         
         print("Model training complete and logged to MLflow!")
         
         return model
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the inventory demand forecasting model")
+    parser.add_argument("--backend", choices=["random_forest", "hist_gradient_boosting"], default="random_forest")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel tree builders for random_forest")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Warm-start the saved random forest on new days only")
+    parser.add_argument("--new-trees", type=int, default=20, help="Trees added per incremental run")
+    parser.add_argument("--n-products", type=int, default=50)
+    parser.add_argument("--start-date", default="2023-01-01")
+    parser.add_argument("--end-date", default="2024-01-15")
+    parser.add_argument("--dataset", help="Train from this Parquet dataset instead of generating data")
+    parser.add_argument("--materialize", action="store_true", help="Write the dataset for the date range and exit")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    train_model()
+    args = parse_args()
+    if args.materialize:
+        materialize_training_dataset(args.dataset or DATASET_PATH, args.n_products, args.start_date, args.end_date)
+        raise SystemExit(0)
+    train_model(
+        backend=args.backend,
+        n_jobs=args.n_jobs,
+        incremental=args.incremental,
+        new_trees=args.new_trees,
+        n_products=args.n_products,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        dataset_path=args.dataset
+    )
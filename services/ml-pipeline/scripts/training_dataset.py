@@ -0,0 +1,72 @@
+"""Partitioned Parquet storage for inventory training data.
+
+Datasets are laid out as <path>/year_month=YYYY-MM/part-0.parquet, rows sorted
+by (product_id, date). load_dataset reads only the requested columns, skips
+month directories outside the date range, and uses row-group statistics to
+skip products that were not asked for. Files are memory-mapped, not copied
+into Python buffers.
+"""
+import os
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+DATASET_PATH = os.getenv("TRAINING_DATASET_PATH", "data/inventory_training")
+ROW_GROUP_ROWS = 16384  # Small enough for product filters to skip row groups
+
+PARTITIONING = ds.partitioning(pa.schema([("year_month", pa.string())]), flavor="hive")
+
+
+def write_dataset(frames: Iterable[pd.DataFrame], path: str = DATASET_PATH) -> int:
+    """Write frames (each holding whole months) as month partitions; returns rows written"""
+    rows = 0
+    for frame in frames:
+        for month, part in frame.groupby(frame['date'].dt.to_period('M'), sort=True):
+            part = part.sort_values(['product_id', 'date'], kind='stable')
+            directory = os.path.join(path, f"year_month={month.strftime('%Y-%m')}")
+            os.makedirs(directory, exist_ok=True)
+            pq.write_table(
+                pa.Table.from_pandas(part, preserve_index=False),
+                os.path.join(directory, "part-0.parquet"),
+                row_group_size=ROW_GROUP_ROWS,
+                compression="zstd"
+            )
+            rows += len(part)
+    return rows
+
+
+def load_dataset(columns: List[str], start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 product_ids: Optional[List[str]] = None, path: str = DATASET_PATH) -> pd.DataFrame:
+    """Read columns for dates in [start_date, end_date] (and product_ids, if given).
+
+    Filters are pushed down to Arrow: whole months are pruned by directory,
+    then row groups by their min/max statistics, before any data is decoded.
+    """
+    dataset = ds.dataset(
+        os.path.abspath(path),
+        format="parquet",
+        partitioning=PARTITIONING,
+        filesystem=fs.LocalFileSystem(use_mmap=True)
+    )
+
+    conditions = []
+    if start_date is not None:
+        conditions.append(ds.field('year_month') >= start_date[:7])
+        conditions.append(ds.field('date') >= pa.scalar(pd.Timestamp(start_date).to_datetime64()))
+    if end_date is not None:
+        conditions.append(ds.field('year_month') <= end_date[:7])
+        conditions.append(ds.field('date') <= pa.scalar(pd.Timestamp(end_date).to_datetime64()))
+    if product_ids is not None:
+        conditions.append(ds.field('product_id').isin(product_ids))
+
+    predicate = None
+    for condition in conditions:
+        predicate = condition if predicate is None else predicate & condition
+
+    table = dataset.to_table(columns=columns, filter=predicate)
+    # Arrow dictionaries become pandas Categoricals rather than object columns
+    return table.to_pandas(split_blocks=True, self_destruct=True)
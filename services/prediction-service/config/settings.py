@@ -0,0 +1,75 @@
+import os
+
+
+def _cpu_limit() -> int:
+    """CPUs this container may use: its cgroup CPU quota if one is set, else the CPUs it may run on.
+
+    os.cpu_count() reports the node's CPUs, so sizing pools from it
+    oversubscribes a pod limited to a fraction of them.
+    """
+    quota_files = [
+        ("/sys/fs/cgroup/cpu.max", None),  # cgroup v2: "<quota> <period>" or "max <period>"
+        ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us"),  # cgroup v1
+    ]
+    for quota_path, period_path in quota_files:
+        try:
+            with open(quota_path) as f:
+                fields = f.read().split()
+            if period_path is not None:
+                with open(period_path) as f:
+                    fields.append(f.read().strip())
+            quota, period = fields[0], fields[1]
+            if quota not in ("max", "-1"):
+                return max(1, int(quota) // int(period))
+            break
+        except (OSError, ValueError, IndexError):
+            continue
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+CPU_LIMIT = _cpu_limit()
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "8000"))
+API_PORT = int(os.getenv("API_PORT", "8001"))  # Request/response predictions, called by the api-gateway
+BATCH_PREDICTION_MAX_ITEMS = int(os.getenv("BATCH_PREDICTION_MAX_ITEMS", "5000"))
+
+# Kafka
+KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+KAFKA_CONSUMER_GROUP = os.getenv("KAFKA_CONSUMER_GROUP", "prediction-service")
+KAFKA_POLL_TIMEOUT_SECONDS = float(os.getenv("KAFKA_POLL_TIMEOUT_SECONDS", "1.0"))
+ERP_EVENT_SCHEMA_PATH = os.getenv(
+    "ERP_EVENT_SCHEMA_PATH",
+    # Shipped with the service; keep in sync with infrastructure/kafka/schemas/erp-event.avsc
+    os.path.join(os.path.dirname(__file__), "..", "src", "schemas", "erp-event.avsc")
+)
+KAFKA_PRODUCER_LINGER_MS = int(os.getenv("KAFKA_PRODUCER_LINGER_MS", "5"))  # Time to fill a produce batch
+KAFKA_PRODUCER_CLOSE_TIMEOUT_SECONDS = float(os.getenv("KAFKA_PRODUCER_CLOSE_TIMEOUT_SECONDS", "10"))
+
+# Feature store
+FEAST_REPO_PATH = os.getenv(
+    "FEAST_REPO_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "infrastructure", "feast")
+)
+FEATURE_CACHE_SIZE = int(os.getenv("FEATURE_CACHE_SIZE", "10000"))  # (feature view, entity) rows kept in memory
+FEATURE_CACHE_MAX_TTL_SECONDS = float(os.getenv("FEATURE_CACHE_MAX_TTL_SECONDS", "3600"))
+
+# Inference
+COMPILED_MODEL_PATH = os.getenv("COMPILED_MODEL_PATH", "")  # .npz from ml-pipeline's export_compiled_model.py
+MODEL_POLL_INTERVAL_SECONDS = float(os.getenv("MODEL_POLL_INTERVAL_SECONDS", "60"))  # Registry check for new versions
+MODEL_WARMUP_ROWS = int(os.getenv("MODEL_WARMUP_ROWS", "64"))  # Dummy batch predicted before a model goes live
+PREDICTION_BATCH_SIZE = int(os.getenv("PREDICTION_BATCH_SIZE", "64"))  # Max rows per model.predict call
+PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", "10"))  # Max wait to fill a batch
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "process")  # "process" or "thread"
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(CPU_LIMIT)))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", str(2 * CPU_LIMIT)))  # Batches submitted to the pool
+
+# Pipeline
+PIPELINE_MAX_IN_FLIGHT = int(os.getenv("PIPELINE_MAX_IN_FLIGHT", "2000"))  # Consumed but not yet committed messages
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))  # Batches buffered between stages
+FEATURE_FETCH_WORKERS = int(os.getenv("FEATURE_FETCH_WORKERS", "4"))  # Concurrent batched feature lookups
+PUBLISH_WORKERS = int(os.getenv("PUBLISH_WORKERS", "4"))  # Batches of predictions published concurrently
+PIPELINE_RETRY_ATTEMPTS = int(os.getenv("PIPELINE_RETRY_ATTEMPTS", "3"))  # Tries per stage before dead-lettering
+PIPELINE_RETRY_BACKOFF_MS = float(os.getenv("PIPELINE_RETRY_BACKOFF_MS", "200"))  # Doubled after every failed try
+DEAD_LETTER_TOPIC = os.getenv("DEAD_LETTER_TOPIC", "erp-events-prediction-dlq")  # Source messages that failed
@@ -0,0 +1,46 @@
+from typing import List
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+from config import settings
+
+class PredictionRequest(BaseModel):
+    entity_id: str
+    entity_type: str
+
+class BatchPredictionRequest(BaseModel):
+    items: List[PredictionRequest] = Field(..., min_length=1, max_length=settings.BATCH_PREDICTION_MAX_ITEMS)
+
+def create_app(service) -> FastAPI:
+    """HTTP front for a running PredictionService; shares its model, executor and feature cache"""
+    app = FastAPI(title="Aurora Prediction Service")
+
+    async def predict(items: List[PredictionRequest]) -> List[dict]:
+        # Only products have a feature view; each distinct product is looked up and scored once
+        product_ids = list(dict.fromkeys(item.entity_id for item in items if item.entity_type == 'product'))
+        predictions, version = [], service.model_version
+        if product_ids:
+            predictions, version = await service.predict_products(product_ids)
+        by_id = dict(zip(product_ids, predictions))
+        return [
+            {
+                "entity_id": item.entity_id,
+                "entity_type": item.entity_type,
+                "predicted_demand": by_id.get(item.entity_id) if item.entity_type == 'product' else None,
+                "model_version": version
+            }
+            for item in items
+        ]
+
+    @app.post("/predict/stock-out")
+    async def predict_stock_out(request: PredictionRequest):
+        result = (await predict([request]))[0]
+        if result["predicted_demand"] is None:
+            raise HTTPException(status_code=404, detail="No features available for entity")
+        return result
+
+    @app.post("/predict/stock-out:batch")
+    async def predict_stock_out_batch(request: BatchPredictionRequest):
+        # One feature lookup and one model call for the whole batch
+        return {"predictions": await predict(request.items)}
+
+    return app
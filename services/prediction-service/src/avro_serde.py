@@ -0,0 +1,45 @@
+import io
+import json
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict
+from fastavro import parse_schema, schemaless_reader
+
+# Confluent wire format: magic byte, 4-byte big-endian schema id, Avro body
+MAGIC_BYTE = 0
+HEADER = struct.Struct(">bI")
+
+def load_schema(path: str) -> dict:
+    """Parse an .avsc file once; the parsed schema is reused for every record"""
+    with open(path) as f:
+        return parse_schema(json.load(f))
+
+class ERPEventDeserializer:
+    """Decodes erp-events records into the standard Aurora event format.
+
+    Framed Avro records are read with the ERPEvent schema; anything else is
+    treated as legacy JSON so the topic can be migrated without a cut-over.
+    """
+    def __init__(self, schema_path: str):
+        self.schema = load_schema(schema_path)
+    
+    def __call__(self, value: bytes) -> Dict[str, Any]:
+        if not value or value[0] != MAGIC_BYTE:
+            return json.loads(value)
+        record = schemaless_reader(io.BytesIO(value[HEADER.size:]), self.schema)
+        return self.from_record(record)
+    
+    @staticmethod
+    def from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        millis = record["timestamp"]
+        timestamp = datetime.fromtimestamp(millis // 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        if millis % 1000:
+            timestamp += f".{millis % 1000:03d}"
+        return {
+            "event_id": record["eventId"],
+            "event_type": record["eventType"],
+            "entity_id": record["entityId"],
+            "timestamp": timestamp + "Z",
+            "payload": json.loads(record["payload"]),
+            "source_system": record["sourceSystem"]
+        }
@@ -0,0 +1,42 @@
+import numpy as np
+
+class CompiledForest:
+    """Array-based evaluator for a regression forest exported by ml-pipeline's export_compiled_model.py.
+
+    All trees live in flat node arrays in which the right child of a split is
+    stored right after its left child and leaves point to themselves. A batch
+    is evaluated for every tree at once by stepping max_depth times through
+    the arrays, with no per-row or per-tree Python loop.
+    """
+    def __init__(self, feature, threshold, left, value, roots, max_depth: int, n_features=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        # Columns the forest was fitted on; None for files exported before it was stored
+        self.n_features = None if n_features is None else int(n_features)
+    
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+    
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        if self.n_features is not None and n_features != self.n_features:
+            # Out-of-range columns would silently read neighbouring rows' values
+            raise ValueError(f"X has {n_features} features, but the forest was fitted on {self.n_features}")
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            cells = np.take(self.feature, nodes)
+            cells += row_offsets
+            go_right = np.take(flat_X, cells) > np.take(self.threshold, nodes)
+            nodes = np.take(self.left, nodes)
+            nodes += go_right
+        return np.take(self.value, nodes).mean(axis=1)
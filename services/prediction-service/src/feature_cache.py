@@ -0,0 +1,52 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import prometheus_client as prom
+
+# Metrics
+cache_hits = prom.Counter('prediction_service_feature_cache_hits',
+                          'Feature rows served from the in-process cache', ['feature_view'])
+cache_misses = prom.Counter('prediction_service_feature_cache_misses',
+                            'Feature rows fetched from the online store', ['feature_view'])
+cache_evictions = prom.Counter('prediction_service_feature_cache_evictions',
+                               'Feature rows dropped from the cache', ['reason'])
+
+class FeatureCache:
+    """Bounded LRU of online feature values keyed by (feature view, entity id), expiring per view"""
+    def __init__(self, max_size: int, ttls: Dict[str, float], clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttls = ttls
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    def get(self, feature_view: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        key = (feature_view, entity_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            del self._entries[key]
+            cache_evictions.labels(reason='expired').inc()
+            entry = None
+        if entry is None:
+            cache_misses.labels(feature_view=feature_view).inc()
+            return None
+        self._entries.move_to_end(key)
+        cache_hits.labels(feature_view=feature_view).inc()
+        return entry[1]
+    
+    def put(self, feature_view: str, entity_id: str, values: Dict[str, Any]):
+        key = (feature_view, entity_id)
+        self._entries[key] = (self.clock() + self.ttls[feature_view], values)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            cache_evictions.labels(reason='size').inc()
+    
+    def invalidate(self, feature_view: str, entity_ids: Optional[Iterable[str]] = None):
+        """Drop the given entities of a view, or the whole view when entity_ids is None"""
+        if entity_ids is None:
+            keys = [key for key in self._entries if key[0] == feature_view]
+        else:
+            keys = [(feature_view, entity_id) for entity_id in entity_ids if (feature_view, entity_id) in self._entries]
+        for key in keys:
+            del self._entries[key]
+        cache_evictions.labels(reason='invalidated').inc(len(keys))
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Dict, List, Optional
+from feast import FeatureStore
+from config import settings
+from feature_cache import FeatureCache
+from structlog import get_logger
+
+logger = get_logger()
+
+# Online feature view and join key serving each entity type (see infrastructure/feast/features.py)
+FEATURE_VIEWS = {
+    'product': ('product_demand_features', 'product_id'),
+    'customer': ('customer_behavior_features', 'customer_id'),
+    'supplier': ('supplier_performance_features', 'supplier_id'),
+}
+
+class FeatureStoreClient:
+    def __init__(self):
+        self.store = FeatureStore(repo_path=settings.FEAST_REPO_PATH)
+        self.cache = FeatureCache(settings.FEATURE_CACHE_SIZE, self._cache_ttls())
+    
+    def _cache_ttls(self) -> Dict[str, float]:
+        """Cache lifetime per feature view: the view's declared ttl, capped by FEATURE_CACHE_MAX_TTL_SECONDS"""
+        ttls = {}
+        for feature_view, _ in FEATURE_VIEWS.values():
+            ttl = settings.FEATURE_CACHE_MAX_TTL_SECONDS
+            try:
+                declared = self.store.get_feature_view(feature_view).ttl
+                if declared:
+                    ttl = min(ttl, declared.total_seconds())
+            except Exception as e:
+                logger.warning("Feature view ttl unavailable", feature_view=feature_view, error=str(e))
+            ttls[feature_view] = ttl
+        return ttls
+    
+    def feature_names(self, entity_type: str) -> List[str]:
+        """Fields served by an entity type's feature view, as registered"""
+        feature_view, _ = FEATURE_VIEWS[entity_type]
+        return [field.name for field in self.store.get_feature_view(feature_view).features]
+    
+    def invalidate(self, feature_view: str, entity_ids: Optional[List[str]] = None):
+        """Forget cached rows after new values were pushed to a feature view"""
+        self.cache.invalidate(feature_view, entity_ids)
+    
+    async def get_features(self, entity_type: str, entity_id: str, feature_names: List[str]) -> Optional[List]:
+        """Fetch one entity's feature row, ordered as feature_names; None if any feature is missing"""
+        rows = await self.get_features_many(entity_type, [entity_id], feature_names)
+        return rows[0]
+    
+    async def get_features_many(self, entity_type: str, entity_ids: List[str],
+                                feature_names: List[str]) -> List[Optional[List]]:
+        """Fetch feature rows for many entities with a single online store lookup.
+
+        Returns one row per entry of entity_ids (duplicates included), ordered as
+        feature_names, or None for entities with missing features.
+        """
+        feature_view, join_key = FEATURE_VIEWS[entity_type]
+        unique_ids = list(dict.fromkeys(entity_ids))
+        
+        values: Dict[str, Dict] = {}
+        missing = []
+        for entity_id in unique_ids:
+            cached = self.cache.get(feature_view, entity_id)
+            if cached is not None and all(name in cached for name in feature_names):
+                values[entity_id] = cached
+            else:
+                missing.append(entity_id)
+        
+        if missing:
+            # Feast's online read is blocking; one call is one Redis pipeline round-trip
+            response = await asyncio.to_thread(
+                self.store.get_online_features,
+                features=[f"{feature_view}:{name}" for name in feature_names],
+                entity_rows=[{join_key: entity_id} for entity_id in missing]
+            )
+            columns = response.to_dict()
+            for index, entity_id in enumerate(missing):
+                fetched = {name: columns[name][index] for name in feature_names}
+                if all(value is not None for value in fetched.values()):
+                    self.cache.put(feature_view, entity_id, fetched)
+                values[entity_id] = fetched
+            logger.debug("Online features fetched", entity_type=entity_type, entities=len(missing))
+        
+        rows: Dict[str, Optional[List]] = {}
+        for entity_id, fetched in values.items():
+            row = [fetched[name] for name in feature_names]
+            rows[entity_id] = None if any(value is None for value in row) else row
+        return [rows[entity_id] for entity_id in entity_ids]
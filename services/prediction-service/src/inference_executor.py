@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, List, Optional
+import mlflow.pyfunc
+from compiled_forest import CompiledForest
+
+# Model held by each process-pool worker, loaded once by the pool initializer
+_worker_model = None
+
+def load_model(model_uri: str):
+    """Load a compiled forest (.npz) or any MLflow pyfunc model"""
+    if model_uri.endswith(".npz"):
+        return CompiledForest.load(model_uri)
+    return mlflow.pyfunc.load_model(model_uri)
+
+def model_input_width(model) -> Optional[int]:
+    """Number of input columns the model was fitted on, or None if it does not say"""
+    for attribute in ("n_features", "n_features_in_"):  # CompiledForest, scikit-learn estimators
+        width = getattr(model, attribute, None)
+        if width is not None:
+            return int(width)
+    metadata = getattr(model, "metadata", None)  # MLflow pyfunc: the logged signature
+    schema = metadata.get_input_schema() if metadata is not None else None
+    return len(schema.inputs) if schema is not None else None
+
+def _load_worker_model(model_uri: str):
+    global _worker_model
+    _worker_model = load_model(model_uri)
+
+def _predict_in_worker(rows: List[Any]) -> List[float]:
+    return [float(value) for value in _worker_model.predict(rows)]
+
+class InferenceExecutor:
+    """Runs model.predict off the event loop.
+
+    "process" spreads batches over a process pool whose workers each load the
+    model once; "thread" uses a thread pool and suits models that release the GIL.
+    At most max_pending batches are submitted at a time, so callers wait
+    instead of queueing unbounded work on the pool.
+    """
+    def __init__(self, mode: str, workers: int, max_pending: int):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Unknown inference executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.model = None
+        self.pool: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(max_pending)
+    
+    async def swap(self, model, model_uri: str, warmup_rows: List[Any]):
+        """Switch inference to a loaded model; in-flight batches finish on the previous one.
+
+        Process workers reload the model from model_uri, so a fresh pool is
+        created and warmed with warmup_rows before it replaces the old one.
+        """
+        if self.mode == "thread":
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+            self.model = model
+            return
+        
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_worker_model,
+            initargs=(model_uri,)
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(pool, _predict_in_worker, warmup_rows) for _ in range(self.workers)
+        ))
+        previous, self.pool, self.model = self.pool, pool, model
+        if previous is not None:
+            previous.shutdown(wait=False)
+    
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+    
+    async def predict(self, rows: List[Any]) -> List[float]:
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                return await loop.run_in_executor(self.pool, _predict_in_worker, rows)
+            return await loop.run_in_executor(self.pool, self.model.predict, rows)
@@ -0,0 +1,40 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from confluent_kafka import Consumer, KafkaException, Message, TopicPartition
+from config import settings
+from structlog import get_logger
+
+logger = get_logger()
+
+class KafkaConsumer:
+    def __init__(self, topic: str, group_id: Optional[str] = None, enable_auto_commit: bool = True,
+                 auto_offset_reset: str = "earliest"):
+        self.topic = topic
+        self.consumer = Consumer({
+            "bootstrap.servers": settings.KAFKA_BOOTSTRAP_SERVERS,
+            "group.id": group_id or settings.KAFKA_CONSUMER_GROUP,
+            "auto.offset.reset": auto_offset_reset,
+            "enable.auto.commit": enable_auto_commit,
+        })
+    
+    async def consume(self) -> AsyncIterator[Message]:
+        """Yield messages from the topic; polling runs off the event loop"""
+        self.consumer.subscribe([self.topic])
+        try:
+            while True:
+                message = await asyncio.to_thread(self.consumer.poll, settings.KAFKA_POLL_TIMEOUT_SECONDS)
+                if message is None:
+                    continue
+                if message.error():
+                    logger.error("Kafka consume error", topic=self.topic, error=str(message.error()))
+                    continue
+                yield message
+        finally:
+            self.consumer.close()
+    
+    def commit(self, topic: str, partition: int, offset: int):
+        """Commit `offset` (the next offset to read) for one partition without blocking"""
+        try:
+            self.consumer.commit(offsets=[TopicPartition(topic, partition, offset)], asynchronous=True)
+        except KafkaException as e:
+            logger.error("Offset commit failed", topic=topic, partition=partition, offset=offset, error=str(e))
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Optional, Union
+from confluent_kafka import KafkaException, Producer
+from config import settings
+from structlog import get_logger
+
+logger = get_logger()
+
+class KafkaProducer:
+    """Asyncio front end for a confluent-kafka Producer.
+
+    produce() only appends to librdkafka's local queue; delivery reports are
+    served by a background poll thread and resolve the awaiting coroutine on
+    its own event loop.
+    """
+    def __init__(self):
+        self.producer = Producer({
+            "bootstrap.servers": settings.KAFKA_BOOTSTRAP_SERVERS,
+            "acks": "all",
+            "enable.idempotence": True,
+            "linger.ms": settings.KAFKA_PRODUCER_LINGER_MS,
+            "compression.type": "lz4",
+        })
+        self._closed = threading.Event()
+        self._poller = threading.Thread(target=self._poll_deliveries, name="kafka-producer-poll", daemon=True)
+        self._poller.start()
+
+    def _poll_deliveries(self):
+        while not self._closed.is_set():
+            self.producer.poll(0.1)
+
+    async def publish(self, topic: str, key: Union[str, bytes, None], value: Union[bytes, Dict[str, Any]],
+                      headers: Optional[Dict[str, Union[str, bytes]]] = None):
+        """Produce one record and wait for the broker to acknowledge it; dict values are sent as JSON"""
+        loop = asyncio.get_running_loop()
+        delivered = loop.create_future()
+
+        def on_delivery(error, message):
+            if error is not None:
+                loop.call_soon_threadsafe(_set_exception, delivered, KafkaException(error))
+            else:
+                loop.call_soon_threadsafe(_set_result, delivered, message)
+
+        payload = value if isinstance(value, bytes) else json.dumps(value).encode('utf-8')
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        while True:
+            try:
+                self.producer.produce(topic, key=key, value=payload,
+                                      headers=list((headers or {}).items()), on_delivery=on_delivery)
+                break
+            except BufferError:
+                # Local queue is full: let the poll thread drain delivery reports, then retry
+                await asyncio.sleep(0.05)
+        return await delivered
+
+    def close(self):
+        """Deliver everything still queued, then stop the poll thread"""
+        remaining = self.producer.flush(settings.KAFKA_PRODUCER_CLOSE_TIMEOUT_SECONDS)
+        if remaining:
+            logger.error("Kafka producer closed with undelivered records", count=remaining)
+        self._closed.set()
+        self._poller.join()
+
+def _set_result(future: asyncio.Future, message):
+    if not future.done():
+        future.set_result(message)
+
+def _set_exception(future: asyncio.Future, error: Exception):
+    if not future.done():
+        future.set_exception(error)
@@ -1,91 +1,381 @@
 import asyncio
 import json
-import mlflow.pyfunc
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+import uvicorn
+from mlflow.tracking import MlflowClient
+import prometheus_client as prom
+from avro_serde import ERPEventDeserializer
 from kafka_consumer import KafkaConsumer
 from kafka_producer import KafkaProducer
 from feature_store_client import FeatureStoreClient
+from inference_executor import InferenceExecutor, load_model, model_input_width
+from micro_batcher import MicroBatcher
+from model_features import MODEL_FEATURES, PRODUCT_FEATURES, calendar_features, check_feature_view, model_row
+from api import create_app
+from offset_tracker import OffsetTracker
 from config import settings
 from structlog import get_logger
 
 logger = get_logger()
 
+# Metrics
+batch_size = prom.Histogram('prediction_service_batch_size', 'Rows per model.predict call',
+                            buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+batch_latency = prom.Histogram('prediction_service_batch_latency_seconds',
+                               'Duration of one batched model.predict call')
+model_load_duration = prom.Histogram('prediction_service_model_load_seconds',
+                                     'Time to load and warm up a model version',
+                                     buckets=[0.5, 1, 2.5, 5, 10, 30, 60, 120, 300])
+dead_lettered = prom.Counter('prediction_service_dead_lettered_messages',
+                             'Source messages sent to the dead-letter topic after failing a stage', ['stage'])
+model_info = prom.Info('prediction_service_model', 'Model version currently serving predictions')
+
+MODEL_NAME = "inventory-demand-forecaster"
+
+class PipelineStalled(RuntimeError):
+    """Messages could be neither processed nor dead-lettered, so their offsets can never be committed"""
+
+class PendingPrediction(NamedTuple):
+    """An event waiting for its features to be fetched and scored as part of a batch"""
+    entity_type: str
+    entity_id: str
+    timestamp: str
+    calendar: Dict[str, int]  # Calendar model inputs of the event's timestamp
+    message: Any  # Source Kafka message; its offset is committed once the prediction is published
+
 class PredictionService:
     def __init__(self):
-        self.kafka_consumer = KafkaConsumer("erp-events")
+        self.kafka_consumer = KafkaConsumer("erp-events", enable_auto_commit=False)
+        # Every replica needs every push to keep its own feature cache fresh. The cache starts empty,
+        # so older pushes are irrelevant: read from the end and never commit, leaving no per-pod offsets behind.
+        self.feature_updates = KafkaConsumer(
+            "ml-features", group_id=f"{settings.KAFKA_CONSUMER_GROUP}-{socket.gethostname()}",
+            enable_auto_commit=False, auto_offset_reset="latest"
+        )
         self.kafka_producer = KafkaProducer()
         self.feature_store = FeatureStoreClient()
+        self.deserialize_event = ERPEventDeserializer(settings.ERP_EVENT_SCHEMA_PATH)
+        
+        # Pipeline: consume -> batch -> fetch features -> predict -> publish, with bounded queues in between
+        self.batcher = MicroBatcher(
+            self._enqueue_batch,
+            max_size=settings.PREDICTION_BATCH_SIZE,
+            max_wait_ms=settings.PREDICTION_BATCH_MAX_WAIT_MS
+        )
+        self.feature_queue = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        self.inference_queue = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        self.publish_queue = asyncio.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+        self.offsets = OffsetTracker()
+        self.in_flight = asyncio.Semaphore(settings.PIPELINE_MAX_IN_FLIGHT)
+        self.inference = InferenceExecutor(
+            mode=settings.INFERENCE_EXECUTOR,
+            workers=settings.INFERENCE_WORKERS,
+            max_pending=settings.INFERENCE_MAX_PENDING
+        )
+        self.registry = MlflowClient()
         self.model = None
+        self.model_version = None
         self.is_running = False
+        self.failure: Optional[asyncio.Future] = None  # Set by a stage that cannot make progress; stops start()
     
     async def load_model(self):
-        """Load the ML model from MLflow registry"""
+        """Load the ML model from MLflow registry, or the compiled forest when configured"""
         try:
-            model_uri = f"models:/inventory-demand-forecaster/Production"
-            self.model = mlflow.pyfunc.load_model(model_uri)
-            logger.info("ML model loaded successfully")
+            version, model_uri = await asyncio.to_thread(self._resolve_model)
+            await self._swap_model(version, model_uri)
+            logger.info("ML model loaded successfully", version=version)
         except Exception as e:
             logger.error("Failed to load ML model", error=str(e))
             # Fallback to local model
-            self.model = mlflow.pyfunc.load_model('models/inventory_model.joblib')
+            await self._swap_model("local", 'models/inventory_model.joblib')
+    
+    def _resolve_model(self) -> Tuple[str, str]:
+        """Return (version, model_uri) of the model that should be serving"""
+        if settings.COMPILED_MODEL_PATH:
+            # Local stand-in for the registry: a rewritten file is a new version
+            path = settings.COMPILED_MODEL_PATH
+            return str(os.stat(path).st_mtime_ns), path
+        
+        latest = self.registry.get_latest_versions(MODEL_NAME, stages=["Production"])
+        if not latest:
+            raise LookupError(f"No Production version of {MODEL_NAME}")
+        return latest[0].version, f"models:/{MODEL_NAME}/{latest[0].version}"
+    
+    async def _swap_model(self, version: str, model_uri: str):
+        """Load and warm up a model version off the hot path, then switch inference to it"""
+        started = time.perf_counter()
+        model = await asyncio.to_thread(load_model, model_uri)
+        width = model_input_width(model)
+        if width is not None and width != len(MODEL_FEATURES):
+            raise ValueError(f"Model {version} takes {width} inputs, the service builds {len(MODEL_FEATURES)}")
+        warmup_rows = [[0.0] * (width or len(MODEL_FEATURES))] * settings.MODEL_WARMUP_ROWS
+        await asyncio.to_thread(model.predict, warmup_rows)
+        await self.inference.swap(model, model_uri, warmup_rows)
+        self.model, self.model_version = model, version
+        
+        duration = time.perf_counter() - started
+        model_load_duration.observe(duration)
+        model_info.info({"version": version, "uri": model_uri})
+        logger.info("Model version serving", version=version, load_seconds=round(duration, 3),
+                    mode=self.inference.mode, workers=self.inference.workers)
+    
+    async def _watch_model_registry(self):
+        """Pick up newly promoted model versions without a restart"""
+        while True:
+            await asyncio.sleep(settings.MODEL_POLL_INTERVAL_SECONDS)
+            try:
+                version, model_uri = await asyncio.to_thread(self._resolve_model)
+                if version != self.model_version:
+                    logger.info("New model version found", version=version, previous=self.model_version)
+                    await self._swap_model(version, model_uri)
+            except Exception as e:
+                logger.error("Model refresh failed", error=str(e))
     
     async def start(self):
         """Start the prediction service"""
+        check_feature_view(await asyncio.to_thread(self.feature_store.feature_names, 'product'))
         await self.load_model()
         self.is_running = True
         
         logger.info("Starting Prediction Service")
         
+        # Start metrics server
+        prom.start_http_server(settings.METRICS_PORT)
+        
+        stages = [self.batcher.run(), self._watch_feature_pushes(), self._watch_model_registry(), self._serve_api()]
+        stages += [self._feature_stage() for _ in range(settings.FEATURE_FETCH_WORKERS)]
+        stages += [self._inference_stage() for _ in range(settings.INFERENCE_MAX_PENDING)]
+        stages += [self._publish_stage() for _ in range(settings.PUBLISH_WORKERS)]
+        tasks = [asyncio.create_task(stage) for stage in stages]
+        self.failure = asyncio.get_running_loop().create_future()
+        consume = asyncio.create_task(self._consume())
+        try:
+            await asyncio.wait([consume, self.failure], return_when=asyncio.FIRST_COMPLETED)
+            if self.failure.done():
+                raise self.failure.exception()
+            await consume
+        finally:
+            for task in tasks + [consume]:
+                task.cancel()
+            await asyncio.to_thread(self.kafka_producer.close)
+            self.inference.shutdown()
+    
+    async def _consume(self):
         async for message in self.kafka_consumer.consume():
             if self.is_running:
+                # Blocks consumption once too many messages are waiting for their commit
+                await self.in_flight.acquire()
+                self.offsets.track(message.topic(), message.partition(), message.offset())
                 await self.process_event(message)
     
+    async def _serve_api(self):
+        """Serve request/response predictions for the api-gateway alongside the Kafka pipeline"""
+        server = uvicorn.Server(uvicorn.Config(create_app(self), host="0.0.0.0", port=settings.API_PORT,
+                                               log_level="warning"))
+        server.install_signal_handlers = lambda: None  # Shutdown is driven by start(), not by uvicorn
+        await server.serve()
+    
+    async def predict_products(self, entity_ids: List[str]) -> Tuple[List[Optional[float]], str]:
+        """Score many products with one feature lookup and one model call.
+
+        Returns one prediction per entity_id (None where features are missing)
+        and the model version that produced them.
+        """
+        version = self.model_version
+        rows = await self.feature_store.get_features_many(
+            entity_type='product',
+            entity_ids=entity_ids,
+            feature_names=PRODUCT_FEATURES
+        )
+        present = [index for index, features in enumerate(rows) if features]
+        predictions: List[Optional[float]] = [None] * len(entity_ids)
+        if present:
+            started = time.perf_counter()
+            calendar = calendar_features()
+            scored = await self.inference.predict([model_row(rows[index], calendar) for index in present])
+            batch_latency.observe(time.perf_counter() - started)
+            batch_size.observe(len(present))
+            for index, prediction in zip(present, scored):
+                predictions[index] = float(prediction)
+        return predictions, version
+    
     async def process_event(self, event):
         """Process an ERP event and generate predictions"""
         try:
-            event_data = json.loads(event.value())
+            event_data = self.deserialize_event(event.value())
             
             # Extract entity information
             entity_type = self._extract_entity_type(event_data)
             entity_id = event_data['entity_id']
-            
-            if entity_type == 'product':
+            timestamp = event_data['timestamp']
+            calendar = calendar_features(timestamp)
+        except Exception as e:
+            logger.error("Prediction processing failed", error=str(e))
+            await self._dead_letter("deserialize", [event], e)
+            return
+        
+        if entity_type != 'product':
+            # Nothing to predict for this event
+            self._complete([event])
+            return
+        
+        # Queue for the next batched feature lookup and prediction
+        await self.batcher.submit(PendingPrediction(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            timestamp=timestamp,
+            calendar=calendar,
+            message=event
+        ))
+    
+    async def _watch_feature_pushes(self):
+        """Invalidate cached features when new values are pushed to a feature view.
+
+        ml-features messages are JSON, {"feature_view": "...", "entity_ids": [...]};
+        without entity_ids the whole view is invalidated. infrastructure/feast/
+        materialize.py publishes one per materialized window.
+        """
+        async for message in self.feature_updates.consume():
+            try:
+                update = json.loads(message.value())
+                self.feature_store.invalidate(update["feature_view"], update.get("entity_ids"))
+            except Exception as e:
+                logger.error("Feature push handling failed", error=str(e))
+    
+    async def _enqueue_batch(self, batch: List[PendingPrediction]):
+        await self.feature_queue.put(batch)
+    
+    async def _feature_stage(self):
+        """Fetch features for each micro-batch with one lookup"""
+        while True:
+            batch = await self.feature_queue.get()
+            try:
                 # Get features from feature store
-                features = await self.feature_store.get_features(
+                rows = await _retry(lambda: self.feature_store.get_features_many(
                     entity_type='product',
-                    entity_id=entity_id,
-                    feature_names=['historical_demand_7d', 'historical_demand_30d', 
-                                  'price', 'day_of_week', 'month']
-                )
-                
-                if features:
-                    # Generate prediction
-                    prediction = self.model.predict([features])[0]
-                    
-                    # Create prediction event
-                    prediction_event = {
-                        "prediction_id": f"pred_{entity_id}_{event_data['timestamp']}",
-                        "entity_type": entity_type,
-                        "entity_id": entity_id,
-                        "prediction_type": "demand_forecast",
-                        "prediction_value": float(prediction),
-                        "confidence": 0.85,  # Simulated confidence
-                        "timestamp": event_data['timestamp'],
-                        "model_version": "1.0"
-                    }
-                    
-                    # Publish prediction
-                    await self.kafka_producer.publish(
-                        topic="predictions-alerts",
-                        key=entity_id,
-                        value=prediction_event
-                    )
-                    
-                    logger.info("Prediction generated", 
-                               entity_id=entity_id, 
-                               prediction=prediction)
+                    entity_ids=[pending.entity_id for pending in batch],
+                    feature_names=PRODUCT_FEATURES
+                ))
+            except Exception as e:
+                logger.error("Feature fetch failed", batch_size=len(batch), error=str(e))
+                await self._dead_letter("feature_fetch", [pending.message for pending in batch], e)
+                continue
             
+            scored = [(pending, model_row(features, pending.calendar))
+                      for pending, features in zip(batch, rows) if features]
+            # Products without features have nothing to predict; they are done
+            self._complete([pending.message for pending, features in zip(batch, rows) if not features])
+            if scored:
+                await self.inference_queue.put(scored)
+    
+    async def _inference_stage(self):
+        """Score each micro-batch with one model call on the inference executor"""
+        while True:
+            scored = await self.inference_queue.get()
+            try:
+                version = self.model_version
+                started = time.perf_counter()
+                predictions = await _retry(lambda: self.inference.predict([features for _, features in scored]))
+                batch_latency.observe(time.perf_counter() - started)
+                batch_size.observe(len(scored))
+            except Exception as e:
+                logger.error("Batch prediction failed", batch_size=len(scored), error=str(e))
+                await self._dead_letter("inference", [pending.message for pending, _ in scored], e)
+                continue
+            await self.publish_queue.put((scored, predictions, version))
+    
+    async def _publish_stage(self):
+        """Publish each micro-batch's predictions, then release its offsets for commit"""
+        while True:
+            scored, predictions, version = await self.publish_queue.get()
+            # Retried per prediction, so one failure does not republish the rest of the batch
+            results = await asyncio.gather(*(
+                _retry(lambda pending=pending, prediction=prediction: self._publish_prediction(
+                    pending, prediction, version
+                ))
+                for (pending, _), prediction in zip(scored, predictions)
+            ), return_exceptions=True)
+            
+            failed = [(pending, result) for (pending, _), result in zip(scored, results)
+                      if isinstance(result, Exception)]
+            self._complete([pending.message for (pending, _), result in zip(scored, results)
+                            if not isinstance(result, Exception)])
+            if failed:
+                logger.error("Prediction publishing failed", batch_size=len(scored), failed=len(failed),
+                             error=str(failed[0][1]))
+                await self._dead_letter("publish", [pending.message for pending, _ in failed], failed[0][1])
+    
+    async def _dead_letter(self, stage: str, messages: list, error: Exception):
+        """Park failed source messages on the dead-letter topic, then let their offsets commit.
+
+        If the dead-letter topic cannot be written either, the messages stay
+        uncommitted and the service stops with PipelineStalled: their partitions
+        could never commit past them again, so they are consumed again after
+        the restart instead.
+        """
+        try:
+            await asyncio.gather(*(
+                _retry(lambda message=message: self.kafka_producer.publish(
+                    topic=settings.DEAD_LETTER_TOPIC,
+                    key=message.key(),
+                    value=message.value(),
+                    headers={
+                        "source_topic": message.topic(),
+                        "source_partition": str(message.partition()),
+                        "source_offset": str(message.offset()),
+                        "stage": stage,
+                        "error": f"{type(error).__name__}: {error}",
+                    }
+                ))
+                for message in messages
+            ))
         except Exception as e:
-            logger.error("Prediction processing failed", error=str(e))
+            logger.error("Dead-lettering failed, messages left uncommitted", stage=stage, count=len(messages),
+                         error=str(e))
+            for _ in messages:
+                self.in_flight.release()
+            if not self.failure.done():
+                stalled = PipelineStalled(f"{len(messages)} messages failed {stage} and could not be dead-lettered")
+                stalled.__cause__ = e
+                self.failure.set_exception(stalled)
+            return
+        dead_lettered.labels(stage=stage).inc(len(messages))
+        self._complete(messages)
+    
+    def _complete(self, messages: list):
+        """Mark messages done and commit every partition whose earlier messages are all done"""
+        for message in messages:
+            commit_offset = self.offsets.done(message.topic(), message.partition(), message.offset())
+            if commit_offset is not None:
+                self.kafka_consumer.commit(message.topic(), message.partition(), commit_offset)
+            self.in_flight.release()
+    
+    async def _publish_prediction(self, pending: PendingPrediction, prediction, model_version: str):
+        # Create prediction event
+        prediction_event = {
+            "prediction_id": f"pred_{pending.entity_id}_{pending.timestamp}",
+            "entity_type": pending.entity_type,
+            "entity_id": pending.entity_id,
+            "prediction_type": "demand_forecast",
+            "prediction_value": float(prediction),
+            "confidence": 0.85,  # Simulated confidence
+            "timestamp": pending.timestamp,
+            "model_version": model_version
+        }
+        
+        # Publish prediction
+        await self.kafka_producer.publish(
+            topic="predictions-alerts",
+            key=pending.entity_id,
+            value=prediction_event
+        )
+        
+        logger.info("Prediction generated", 
+                   entity_id=pending.entity_id, 
+                   prediction=prediction)
     
     def _extract_entity_type(self, event_data):
         """Extract entity type from event data"""
@@ -96,6 +386,20 @@ class PredictionService:
             return 'order'
         return 'unknown'
 
+async def _retry(operation: Callable[[], Awaitable], attempts: Optional[int] = None,
+                 backoff_ms: Optional[float] = None):
+    """Await operation(), retrying with exponential backoff; the last failure is raised"""
+    attempts = attempts or settings.PIPELINE_RETRY_ATTEMPTS
+    delay = (backoff_ms if backoff_ms is not None else settings.PIPELINE_RETRY_BACKOFF_MS) / 1000
+    for attempt in range(attempts):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            logger.warning("Retrying after failure", attempt=attempt + 1, error=str(e))
+            await asyncio.sleep(delay * 2 ** attempt)
+
 async def main():
     service = PredictionService()
     await service.start()
@@ -0,0 +1,33 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+class MicroBatcher:
+    """Groups submitted items into batches of up to max_size items or max_wait_ms, whichever comes first"""
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[None]], max_size: int, max_wait_ms: float):
+        self.handler = handler
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        # Bounded so that producers slow down when batches are not being handled fast enough
+        self.queue = asyncio.Queue(maxsize=max_size * 4)
+    
+    async def submit(self, item: Any):
+        await self.queue.put(item)
+    
+    async def run(self):
+        """Collect and hand off batches until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self.handler(batch)
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Model input columns, in order (ml-pipeline's train_inventory_model.FEATURE_COLUMNS)
+MODEL_FEATURES = ['day_of_week', 'day_of_year', 'month', 'historical_demand_7d', 'historical_demand_30d',
+                  'price', 'is_weekend']
+
+# Model inputs served by the product_demand_features view, and the view field each comes from.
+# The calendar inputs are derived from the event timestamp instead.
+STORE_FEATURES: Dict[str, str] = {
+    'historical_demand_7d': 'avg_demand_7d',
+    'historical_demand_30d': 'avg_demand_30d',
+    'price': 'price',
+}
+PRODUCT_FEATURES = list(STORE_FEATURES.values())  # Fetched from the online store, in this order
+
+def calendar_features(timestamp: Optional[str] = None) -> Dict[str, int]:
+    """Calendar model inputs for an ISO timestamp (default: now, UTC), computed as in training"""
+    moment = datetime.fromisoformat(timestamp) if timestamp else datetime.now(timezone.utc)
+    return {
+        'day_of_week': moment.weekday(),
+        'day_of_year': moment.timetuple().tm_yday,
+        'month': moment.month,
+        'is_weekend': int(moment.weekday() >= 5),
+    }
+
+def model_row(stored: List, calendar: Dict[str, int]) -> List[float]:
+    """Build one model input row from a PRODUCT_FEATURES row and calendar_features()"""
+    values = dict(zip(STORE_FEATURES, stored), **calendar)
+    return [float(values[name]) for name in MODEL_FEATURES]
+
+def check_feature_view(feature_names: List[str]):
+    """Fail fast when the product feature view no longer serves what the model needs"""
+    missing = [name for name in PRODUCT_FEATURES if name not in feature_names]
+    if missing:
+        raise ValueError(f"product_demand_features is missing {missing}, needed for model inputs {MODEL_FEATURES}")
@@ -0,0 +1,29 @@
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
+
+class OffsetTracker:
+    """Works out how far each partition can be committed when messages finish out of order.
+
+    A partition's commit position only moves past an offset once that message
+    and every earlier tracked message of the same partition is done.
+    """
+    def __init__(self):
+        self._pending: Dict[Tuple[str, int], deque] = {}
+        self._done: Dict[Tuple[str, int], Set[int]] = {}
+    
+    def track(self, topic: str, partition: int, offset: int):
+        """Register a consumed message; offsets of a partition must be tracked in increasing order"""
+        key = (topic, partition)
+        self._pending.setdefault(key, deque()).append(offset)
+        self._done.setdefault(key, set())
+    
+    def done(self, topic: str, partition: int, offset: int) -> Optional[int]:
+        """Mark a message done; returns the new commit offset if the partition advanced"""
+        key = (topic, partition)
+        pending, done = self._pending[key], self._done[key]
+        done.add(offset)
+        committed = None
+        while pending and pending[0] in done:
+            committed = pending.popleft()
+            done.discard(committed)
+        return None if committed is None else committed + 1